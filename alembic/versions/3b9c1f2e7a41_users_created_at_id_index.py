@@ -0,0 +1,30 @@
+"""add composite index for keyset pagination on users
+
+Revision ID: 3b9c1f2e7a41
+Revises: ef1d775276c0
+Create Date: 2026-10-18 09:12:44.512031
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c1f2e7a41'
+down_revision: Union[str, None] = 'ef1d775276c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE INDEX CONCURRENTLY can't run inside a transaction; building it concurrently keeps the
+# users table writable for the whole build.
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_created_at_id', table_name='users', postgresql_concurrently=True)
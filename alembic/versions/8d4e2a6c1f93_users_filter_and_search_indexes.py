@@ -0,0 +1,38 @@
+"""add indexes for filtering and prefix search on users
+
+Revision ID: 8d4e2a6c1f93
+Revises: 3b9c1f2e7a41
+Create Date: 2026-10-18 14:37:05.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2a6c1f93'
+down_revision: Union[str, None] = '3b9c1f2e7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Built concurrently, one index per statement outside a transaction, so writes to users are
+# never blocked while the indexes are built.
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_users_locked_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_locked'), postgresql_concurrently=True)
+        op.create_index('ix_users_unverified_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('NOT email_verified'), postgresql_concurrently=True)
+        op.create_index('ix_users_nickname_pattern', 'users', ['nickname'], unique=False, postgresql_ops={'nickname': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_users_email_pattern', 'users', ['email'], unique=False, postgresql_ops={'email': 'text_pattern_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_pattern', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_nickname_pattern', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_unverified_created_at_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_locked_created_at_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_role_created_at_id', table_name='users', postgresql_concurrently=True)
@@ -1,3 +1,5 @@
+import asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -9,17 +11,67 @@ class Database:
     _session_factory = None
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
+    def initialize(cls, database_url: str, echo: bool = False, pool_size: int = 5, max_overflow: int = 10,
+                   pool_timeout: int = 30, pool_recycle: int = -1, pool_pre_ping: bool = False,
+                   statement_cache_size: int = 100):
         """Initialize the async engine and sessionmaker."""
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            connect_args = {}
+            if database_url.startswith("postgresql+asyncpg"):
+                # SQLAlchemy's adapter and asyncpg itself each keep a prepared statement cache
+                connect_args["prepared_statement_cache_size"] = statement_cache_size
+                connect_args["statement_cache_size"] = statement_cache_size
+            cls._engine = create_async_engine(
+                database_url,
+                echo=echo,
+                future=True,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                connect_args=connect_args,
+            )
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
 
+    @classmethod
+    def get_engine(cls):
+        """Returns the engine, ensuring it's initialized."""
+        if cls._engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        return cls._engine
+
     @classmethod
     def get_session_factory(cls):
         """Returns the session factory, ensuring it's initialized."""
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    async def warm_up(cls, connections: int) -> int:
+        """
+        Open up to `connections` pooled connections concurrently and run a trivial query on each,
+        so the first requests don't pay for connection setup. Returns the number warmed.
+        """
+        engine = cls.get_engine()
+        connections = min(connections, engine.pool.size())
+        if connections <= 0:
+            return 0
+
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(ping() for _ in range(connections)))
+        return connections
+
+    @classmethod
+    async def dispose(cls):
+        """Close all pooled connections and forget the engine."""
+        if cls._engine is not None:
+            await cls._engine.dispose()
+        cls._engine = None
+        cls._session_factory = None
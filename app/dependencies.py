@@ -1,21 +1,37 @@
-from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
+from builtins import Exception, dict, isinstance, str
+from functools import lru_cache
+import secrets
+from typing import FrozenSet, Iterable, Optional, Union
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import Database
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
-from settings.config import Settings
+from app.services.email_queue import get_email_queue
+from app.services.jwt_service import decode_token_cached
+from app.services.rate_limiter import client_ip, get_rate_limiter
+from app.utils.security import PasswordHashingBusy
+from settings.config import Settings, settings
 from fastapi import Depends
 
 def get_settings() -> Settings:
-    """Return application settings."""
-    return Settings()
+    """Return the application settings, read once per process; use `override_settings` to change them in tests."""
+    return settings
 
-def get_email_service() -> EmailService:
-    template_manager = TemplateManager()
-    return EmailService(template_manager=template_manager)
+_email_service: Optional[EmailService] = None
+
+async def get_email_service() -> EmailService:
+    """
+    Return the process-wide email service, creating it on first use.
+
+    Its SMTP client opens a connection per send and the template cache is shared, so one instance
+    serves every request. Async so resolving it doesn't go through the threadpool.
+    """
+    global _email_service
+    if _email_service is None:
+        _email_service = EmailService(template_manager=TemplateManager(), email_queue=get_email_queue())
+    return _email_service
 
 async def get_db() -> AsyncSession:
     """Dependency that provides a database session for each request."""
@@ -23,19 +39,21 @@ async def get_db() -> AsyncSession:
     async with async_session_factory() as session:
         try:
             yield session
+        except (HTTPException, PasswordHashingBusy):
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     user_id: str = payload.get("sub")
@@ -44,9 +62,63 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
     return {"user_id": user_id, "role": user_role}
 
-def require_role(role: str):
-    def role_checker(current_user: dict = Depends(get_current_user)):
-        if current_user["role"] not in role:
+def require_role(role: Union[str, Iterable[str]]):
+    """
+    Return a dependency that admits only users whose token carries one of the given roles.
+
+    Checkers are built once per distinct role set and shared between routes, so FastAPI resolves
+    `get_current_user` (and parses the bearer token) once per request however many routes or
+    dependencies ask for the same roles.
+    """
+    allowed = frozenset([role]) if isinstance(role, str) else frozenset(role)
+    return _role_checker(allowed)
+
+@lru_cache(maxsize=None)
+def _role_checker(allowed: FrozenSet[str]):
+    # Async so the check runs inline on the event loop instead of being dispatched to the threadpool
+    async def role_checker(current_user: dict = Depends(get_current_user)):
+        if current_user["role"] not in allowed:
             raise HTTPException(status_code=403, detail="Operation not permitted")
         return current_user
     return role_checker
+
+async def require_metrics_access(token: str = Depends(oauth2_scheme)):
+    """Admit a scraper presenting the configured `metrics_token`, or an admin's access token."""
+    if settings.metrics_token and secrets.compare_digest(token.encode(), settings.metrics_token.encode()):
+        return
+    current_user = await get_current_user(token)
+    if current_user["role"] != "ADMIN":
+        raise HTTPException(status_code=403, detail="Operation not permitted")
+
+async def _target_email(request: Request) -> Optional[str]:
+    """The account an auth request is aimed at: the form's username or the JSON body's email."""
+    # FastAPI has already read and parsed the body, and Starlette caches it on the request
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        body = await request.json()
+        email = body.get("email") if isinstance(body, dict) else None
+    elif content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+        email = (await request.form()).get("username")
+    else:
+        email = None
+    return email.strip().lower() if isinstance(email, str) else None
+
+def rate_limit(scope: str):
+    """
+    Return a dependency that rejects a request with 429 once its client IP or target email has
+    used up the attempts allowed for `scope` (see `RateLimiter`). List it before dependencies that
+    touch the database so rejected requests cost neither a query nor a bcrypt round.
+    """
+    async def check_rate_limit(request: Request):
+        limiter = get_rate_limiter()
+        if limiter is None:
+            return
+        peer = request.client.host if request.client else None
+        ip = client_ip(request.headers.get("x-forwarded-for"), peer, settings.forwarded_trusted_hops)
+        result = await limiter.check(scope, ip, await _target_email(request))
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429, detail="Too many attempts, try again later.",
+                headers={"Retry-After": str(result.retry_after)},
+            )
+    return check_rate_limit
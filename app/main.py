@@ -1,10 +1,17 @@
 from builtins import Exception
-from fastapi import FastAPI
-from starlette.responses import JSONResponse
+import logging
+from fastapi import Depends, FastAPI
+from starlette.responses import JSONResponse, Response
 from app.database import Database
-from app.dependencies import get_settings
+from app.dependencies import get_settings, require_metrics_access
 from app.routers import user_routes
+from app.services.email_queue import get_email_queue
 from app.utils.api_description import getDescription
+from app.utils.metrics import MetricsMiddleware, instrument_engine, registry
+from app.utils.security import PasswordHashingBusy, shutdown_hashing_pool
+
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -17,15 +24,51 @@ app = FastAPI(
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
 )
 
+if get_settings().metrics_enabled:
+    app.add_middleware(MetricsMiddleware, server_timing=get_settings().server_timing_enabled)
+
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url,
+        settings.debug,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        statement_cache_size=settings.db_statement_cache_size,
+    )
+    if settings.metrics_enabled:
+        instrument_engine(Database.get_engine())
+    try:
+        warmed = await Database.warm_up(settings.db_pool_warmup)
+        logger.info("Pre-warmed %d database connections", warmed)
+    except Exception as e:
+        logger.warning("Database pool warm-up failed: %s", e)
+    if settings.email_queue_enabled:
+        await get_email_queue().start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_email_queue().stop()
+    await Database.dispose()
+    shutdown_hashing_pool()
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"message": str(exc)}, headers={"Retry-After": "1"})
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Request and span latency histograms in the Prometheus text format, for admins and the metrics scraper."""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(user_routes.router)
 
 
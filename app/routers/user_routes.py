@@ -1,24 +1,53 @@
-from builtins import dict, int, len, str
-from datetime import timedelta
+from builtins import UnicodeDecodeError, bool, dict, int, len, str, sum
+from datetime import datetime, timedelta
+from typing import Optional
 from uuid import UUID
-import re
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from app.dependencies import get_current_user, get_db, get_email_service, rate_limit, require_role
 from app.schemas.pagination_schema import EnhancedPagination
 from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
+from app.models.user_model import UserRole
+from app.schemas.user_schemas import BulkImportResponse, LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
 from app.services.user_service import UserService
 from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.bulk_export import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, csv_lines, ndjson_lines
+from app.utils.bulk_import import import_format, iter_import_records, iter_lines
+from app.utils.link_generation import generate_cursor_pagination_links, generate_pagination_links
 from app.dependencies import get_settings
+from app.utils.security import PASSWORD_REQUIREMENTS, is_strong_password
+from app.utils.serialization import USER_RESPONSE_FIELDS, ORJSONResponse, link_to_dict, parse_fields, user_to_dict, users_to_dicts
 from app.services.email_service import EmailService
 
-router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+router = APIRouter(default_response_class=ORJSONResponse)
 settings = get_settings()
 
+FIELDS_QUERY = Query(None, description="Comma-separated user fields to return, e.g. `id,nickname,email`. Defaults to all fields.")
+
+
+def _parse_fields(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def user_filters(
+    role: Optional[UserRole] = None,
+    is_locked: Optional[bool] = None,
+    email_verified: Optional[bool] = None,
+    created_after: Optional[datetime] = Query(None, description="Only users created at or after this time."),
+    created_before: Optional[datetime] = Query(None, description="Only users created before this time."),
+    search: Optional[str] = Query(None, min_length=1, max_length=255, description="Prefix of the nickname or email."),
+) -> dict:
+    """Listing filters shared by the list and export endpoints; unset filters are None."""
+    return {
+        "role": role, "is_locked": is_locked, "email_verified": email_verified,
+        "created_after": created_after, "created_before": created_before, "search": search,
+    }
+
 
 # Password validation function to enforce strong password criteria
 def validate_password(password: str):
@@ -30,18 +59,46 @@ def validate_password(password: str):
     - Contain at least one number.
     - Contain at least one special character.
     """
-    password_regex = re.compile(
-        r'^(?=.*[A-Za-z])(?=.*\d)(?=.*[A-Z])(?=.*[!@#$%^&*(),.?":{}|<>])[A-Za-z\d!@#$%^&*(),.?":{}|<>]{8,}$'
-    )
-    if not password_regex.match(password):
+    if not is_strong_password(password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Password must be at least 8 characters long, contain an uppercase letter, a number, and a special character."
+            detail=PASSWORD_REQUIREMENTS
         )
 
 
+@router.get("/users/export", response_class=StreamingResponse, name="export_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    filters: dict = Depends(user_filters),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_role(["ADMIN"]))
+):
+    """
+    Export users, optionally filtered like `GET /users/`, as JSON Lines (`format=ndjson`) or CSV (`format=csv`).
+
+    Rows are streamed from a server-side cursor in batches of `export_batch_size`, so the export runs
+    in constant memory whatever the table size. Passwords and verification tokens are not exported.
+    """
+    async def body():
+        # The request's session is closed once this endpoint returns; it is reused here for the
+        # streaming transaction and closed again when the export finishes or the client goes away.
+        try:
+            batches = UserService.stream_users(db, EXPORT_COLUMNS, settings.export_batch_size, filters)
+            encode = csv_lines if format == "csv" else ndjson_lines
+            async for chunk in encode(batches):
+                yield chunk
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -51,33 +108,19 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
+        fields: Optional comma-separated subset of fields to load and return.
         db: Dependency that provides an AsyncSession for database access.
-        token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
     """
-    user = await UserService.get_by_id(db, user_id)
+    selected = _parse_fields(fields)
+    user = await UserService.get_by_id(db, user_id, selected)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=user.id,
-        nickname=user.nickname,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        bio=user.bio,
-        profile_picture_url=user.profile_picture_url,
-        github_profile_url=user.github_profile_url,
-        linkedin_profile_url=user.linkedin_profile_url,
-        role=user.role,
-        email=user.email,
-        last_login_at=user.last_login_at,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        links=create_user_links(user.id, request)  
-    )
+    return ORJSONResponse(user_to_dict(user, selected or USER_RESPONSE_FIELDS))
 
 
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Update user information.
 
@@ -89,25 +132,11 @@ async def update_user(user_id: UUID, user_update: UserUpdate, request: Request,
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=updated_user.id,
-        bio=updated_user.bio,
-        first_name=updated_user.first_name,
-        last_name=updated_user.last_name,
-        nickname=updated_user.nickname,
-        email=updated_user.email,
-        last_login_at=updated_user.last_login_at,
-        profile_picture_url=updated_user.profile_picture_url,
-        github_profile_url=updated_user.github_profile_url,
-        linkedin_profile_url=updated_user.linkedin_profile_url,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at,
-        links=create_user_links(updated_user.id, request)
-    )
+    return ORJSONResponse(user_to_dict(updated_user))
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, name="delete_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Delete a user by their ID.
 
@@ -120,7 +149,7 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
 
 
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
-async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Create a new user.
 
@@ -136,29 +165,40 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     Returns:
     - UserResponse: The newly created user's information along with navigation links.
     """
-    existing_user = await UserService.get_by_email(db, user.email)
-    if existing_user:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    
     # Validate the password
     validate_password(user.password)
-    
+
+    # UserService.create checks for an existing email itself and returns None when it is taken;
+    # other failures raise and are answered by the 500 handler
     created_user = await UserService.create(db, user.model_dump(), email_service)
     if not created_user:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
-    
-    return UserResponse.model_construct(
-        id=created_user.id,
-        bio=created_user.bio,
-        first_name=created_user.first_name,
-        last_name=created_user.last_name,
-        profile_picture_url=created_user.profile_picture_url,
-        nickname=created_user.nickname,
-        email=created_user.email,
-        last_login_at=created_user.last_login_at,
-        created_at=created_user.created_at,
-        updated_at=created_user.updated_at,
-        links=create_user_links(created_user.id, request)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
+
+    return ORJSONResponse(user_to_dict(created_user), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/users/bulk", response_model=BulkImportResponse, tags=["User Management Requires (Admin or Manager Roles)"], name="bulk_create_users")
+async def bulk_create_users(request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Create many users from a JSON Lines (`application/x-ndjson`) or CSV (`text/csv`, with a header row) upload.
+
+    The body is read as a stream and imported in batches of `bulk_import_batch_size` rows. Each row takes
+    the same fields as `POST /users/`; rows with an email that is already registered are reported as
+    duplicates rather than failing the import. Returns a per-row report.
+    """
+    fmt = import_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Upload users as application/x-ndjson or text/csv")
+    records = iter_import_records(iter_lines(request.stream()), fmt)
+    try:
+        results = await UserService.bulk_create(db, records, email_service, settings.bulk_import_batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload must be UTF-8 encoded")
+    return BulkImportResponse(
+        created=sum(1 for result in results if result['status'] == 'created'),
+        duplicates=sum(1 for result in results if result['status'] == 'duplicate'),
+        invalid=sum(1 for result in results if result['status'] == 'invalid'),
+        results=results,
     )
 
 
@@ -167,45 +207,71 @@ async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    filters: dict = Depends(user_filters),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
-
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
-    
-    # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
-        total=total_users,
-        page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
-    )
-
+    """
+    List users.
 
-@router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
+    Pages by `skip`/`limit` by default. Passing `cursor` (empty for the first page) switches to keyset
+    pagination ordered by creation time, which stays fast on deep pages; follow the `next`/`prev` links.
+    `fields` limits both the columns loaded and the fields returned for each user. The filters narrow
+    the listing and its total; `search` matches the start of the nickname or email.
+    """
+    selected = _parse_fields(fields)
+    strategy = settings.user_count_strategy
+    if cursor is not None:
+        try:
+            users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db, cursor, limit, selected, filters)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        total_users, total_estimated = await UserService.count_with_strategy(db, strategy, filters)
+        # Carry the fieldset and filters over to the other pages
+        carried = {name: value for name, value in request.query_params.items() if name not in ("cursor", "limit", "skip")}
+        pagination_links = generate_cursor_pagination_links(request, cursor, limit, next_cursor, prev_cursor, carried)
+        page = None
+    else:
+        total_users = None
+        total_estimated = False
+        if strategy == "window":
+            users, total_users = await UserService.list_users_with_total(db, skip, limit, selected, filters)
+        else:
+            users = await UserService.list_users(db, skip, limit, selected, filters)
+        if total_users is None:
+            total_users, total_estimated = await UserService.count_with_strategy(db, strategy, filters)
+        pagination_links = generate_pagination_links(request, skip, limit, total_users)
+        page = skip // limit + 1
+
+    # Rows go straight to JSON; the response model only documents the shape
+    return ORJSONResponse({
+        "items": users_to_dicts(users, selected or USER_RESPONSE_FIELDS),
+        "total": total_users,
+        "total_estimated": total_estimated,
+        "page": page,
+        "size": len(users),
+        "links": [link_to_dict(link) for link in pagination_links],
+    })
+
+
+@router.post("/register/", response_model=UserResponse, tags=["Login and Registration"], dependencies=[Depends(rate_limit("register"))])
 async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
     # Validate password before creating the user
     validate_password(user_data.password)
     
     user = await UserService.register_user(session, user_data.model_dump(), email_service)
     if user:
-        return user
+        return ORJSONResponse(user_to_dict(user))
     raise HTTPException(status_code=400, detail="Email already exists")
 
 
-@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
+@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"], dependencies=[Depends(rate_limit("login"))])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    user, locked = await UserService.authenticate_user(session, form_data.username, form_data.password)
+    if locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     
     # Validate password strength during login
     validate_password(form_data.password)
@@ -4,6 +4,7 @@ from datetime import datetime
 from enum import Enum
 import uuid
 import re
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 class UserRole(str, Enum):
@@ -87,5 +88,19 @@ class ErrorResponse(BaseModel):
 class UserListResponse(BaseModel):
     items: List[UserResponse] = Field(..., example=[])
     total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
-    size: int = Field(..., example=10)
\ No newline at end of file
+    total_estimated: bool = Field(False, example=False, description="True when total is an estimate or a cached figure rather than an exact count.")
+    page: Optional[int] = Field(None, example=1, description="Page number, omitted when paginating by cursor.")
+    size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list)
+class BulkImportRowResult(BaseModel):
+    row: int = Field(..., example=1, description="1-based data row in the uploaded file, not counting a CSV header.")
+    status: str = Field(..., example="created", description="'created', 'duplicate' or 'invalid'.")
+    id: Optional[uuid.UUID] = Field(None, example=str(uuid.uuid4()))
+    email: Optional[str] = Field(None, example="john.doe@example.com")
+    errors: List[str] = Field(default_factory=list)
+
+class BulkImportResponse(BaseModel):
+    created: int = Field(..., example=2)
+    duplicates: int = Field(..., example=1)
+    invalid: int = Field(..., example=0)
+    results: List[BulkImportRowResult] = Field(default_factory=list)
@@ -0,0 +1,184 @@
+# serve.py
+"""
+Production entry point: `python -m app.serve`.
+
+Runs the app under gunicorn with uvicorn workers (or uvicorn's own process manager where gunicorn
+isn't available), one worker per CPU the container may use. uvloop and httptools are used when
+installed, and keep-alive, backlog and graceful timeout come from Settings. For development with
+auto-reload keep using `uvicorn app.main:app --reload`.
+
+bcrypt releases the GIL, so every worker's hashing threads compete for the same cores. Unless
+PASSWORD_HASH_WORKERS is set explicitly, each worker gets an equal share of the CPUs instead of
+the default pool size, so the workers together don't oversubscribe the machine.
+
+The rate limiter and the user cache default to in-process ('memory') backends. With several
+workers each process would count attempts and cache users on its own, multiplying the rate
+limits and serving stale users after another worker changes them, so the launcher refuses to
+start more than one worker unless those backends are Redis (or the cache is off).
+"""
+from builtins import int, max, min, print, round, str
+import argparse
+import importlib.util
+import logging
+import math
+import os
+import sys
+from typing import Dict, List, Optional
+from settings.config import override_settings, settings
+
+APP = "app.main:app"
+logger = logging.getLogger(__name__)
+
+
+def cpu_limit() -> int:
+    """CPUs this process may use: the cgroup CPU quota if there is one, else the CPU affinity."""
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        available = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        available = min(available, max(1, math.ceil(quota)))
+    return available
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    try:  # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:  # cgroup v1: quota is -1 when unlimited
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as file:
+            quota = int(file.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as file:
+            period = int(file.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def event_loop() -> str:
+    return "uvloop" if _installed("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if _installed("httptools") else "h11"
+
+
+def per_process_backends() -> List[str]:
+    """Settings whose backend keeps state inside each worker process instead of sharing it."""
+    backends = []
+    if settings.rate_limit_enabled and settings.rate_limit_backend == "memory":
+        backends.append("rate_limit_backend")
+    if settings.user_cache_backend == "memory":
+        backends.append("user_cache_backend")
+    return backends
+
+
+def plan(workers: int = 0, server: Optional[str] = None) -> Dict[str, object]:
+    """Work out how to run: server, worker count and per-worker settings."""
+    cpus = cpu_limit()
+    workers = workers or settings.server_workers or cpus
+    if server is None:
+        server = "gunicorn" if _installed("gunicorn") and sys.platform != "win32" else "uvicorn"
+    overrides = {}
+    if "PASSWORD_HASH_WORKERS" not in os.environ:
+        overrides["password_hash_workers"] = max(1, round(cpus / workers))
+    return {
+        "server": server, "workers": workers, "cpus": cpus,
+        "loop": event_loop(), "http": http_protocol(), "settings": overrides,
+        "per_process_backends": per_process_backends() if workers > 1 else [],
+    }
+
+
+def _uvicorn_worker_class():
+    from uvicorn.workers import UvicornWorker
+
+    class TunedUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": event_loop(), "http": http_protocol()}
+
+    return TunedUvicornWorker
+
+
+# gunicorn takes its worker class by import path
+TunedUvicornWorker = _uvicorn_worker_class() if _installed("gunicorn") else None
+
+
+def run_gunicorn(workers: int, host: str, port: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            config = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "worker_class": "app.serve.TunedUvicornWorker",
+                "keepalive": settings.server_keepalive,
+                "backlog": settings.server_backlog,
+                "graceful_timeout": settings.server_graceful_timeout,
+                "accesslog": None,
+            }
+            for key, value in config.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Imported in each worker after the fork, not in the arbiter
+            from app.main import app
+            return app
+
+    Application().run()
+
+
+def run_uvicorn(workers: int, host: str, port: int, loop: str, http: str):
+    import uvicorn
+    uvicorn.run(
+        APP, host=host, port=port, workers=workers, loop=loop, http=http,
+        timeout_keep_alive=settings.server_keepalive, backlog=settings.server_backlog,
+        timeout_graceful_shutdown=settings.server_graceful_timeout, access_log=False,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the application with production settings.")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: server_workers, else one per CPU)")
+    parser.add_argument("--server", choices=("gunicorn", "uvicorn"), help="process manager (default: gunicorn if installed)")
+    parser.add_argument("--allow-per-process-backends", action="store_true",
+                        help="start several workers even though rate limits or the user cache are kept per process")
+    parser.add_argument("--dry-run", action="store_true", help="print the launch plan and exit")
+    args = parser.parse_args(argv)
+
+    launch = plan(args.workers, args.server)
+    if args.dry_run:
+        print(launch)
+        return 0
+    logging.basicConfig(level=logging.INFO)
+    if launch["per_process_backends"]:
+        names = ", ".join(name.upper() for name in launch["per_process_backends"])
+        message = (f"{names} is 'memory', so each of the {launch['workers']} workers would keep its own rate limit "
+                   f"counters or user cache. Set it to 'redis', or run with --workers 1.")
+        if not args.allow_per_process_backends:
+            logger.error("%s Pass --allow-per-process-backends to start anyway.", message)
+            return 2
+        logger.warning(message)
+    logger.info("Starting %(server)s with %(workers)d workers on %(cpus)d CPUs, loop=%(loop)s http=%(http)s", launch)
+    # Workers forked by gunicorn inherit the overridden settings; uvicorn's spawned ones read the environment
+    for name, value in launch["settings"].items():
+        os.environ[name.upper()] = str(value)
+    with override_settings(**launch["settings"]):
+        if launch["server"] == "gunicorn":
+            run_gunicorn(launch["workers"], args.host, args.port)
+        else:
+            run_uvicorn(launch["workers"], args.host, args.port, launch["loop"], launch["http"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
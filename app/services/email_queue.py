@@ -0,0 +1,207 @@
+# email_queue.py
+from builtins import Exception, RuntimeError, bool, float, int, isinstance, len, list, range, str
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
+from settings.config import settings
+from app.utils.smtp_connection import SMTPClient
+
+if TYPE_CHECKING:
+    import smtplib  # imported where connections are used, so it stays off the startup path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboundEmail:
+    subject: str
+    html_content: str
+    recipient: str
+    attempts: int = 0
+
+
+class EmailQueue:
+    """
+    Background delivery queue for outbound email.
+
+    Requests only render and enqueue a message. Worker tasks pull messages in batches and
+    deliver each batch over a persistent SMTP connection, which is opened lazily, reused
+    across batches and closed after `idle_timeout` seconds without mail. Messages that fail
+    with a 4xx reply or a connection error are retried with exponential backoff up to
+    `max_retries` times; a permanent 5xx rejection fails straight away.
+    """
+
+    def __init__(self, smtp_client: SMTPClient, workers: int = 1, batch_size: int = 20, max_size: int = 10000,
+                 max_retries: int = 3, retry_backoff: float = 1.0, idle_timeout: float = 30.0):
+        self.smtp_client = smtp_client
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self.sent = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"email-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the workers, first giving queued messages and pending retries up to `timeout` seconds to go out."""
+        if not self.is_running:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email queue stopped with %d messages undelivered", self._queue.qsize())
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries = set()
+
+    async def _drain(self):
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*list(self._retries), return_exceptions=True)
+
+    async def enqueue(self, subject: str, html_content: str, recipient: str):
+        if not self.is_running:
+            raise RuntimeError("Email queue is not running")
+        self._queue.put_nowait(OutboundEmail(subject, html_content, recipient))
+
+    async def _worker(self):
+        connection: Optional["smtplib.SMTP"] = None
+        try:
+            while True:
+                try:
+                    first = await asyncio.wait_for(self._queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if connection is not None:
+                        await asyncio.to_thread(self._close, connection)
+                        connection = None
+                    continue
+                batch = [first]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                try:
+                    # Counters are only updated here on the event loop, never from the delivery threads
+                    connection, sent, failures = await asyncio.to_thread(self._deliver, connection, batch)
+                    self.sent += sent
+                    for email, error in failures:
+                        self._retry_later(email, error)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            if connection is not None:
+                await asyncio.to_thread(self._close, connection)
+
+    def _deliver(self, connection: Optional["smtplib.SMTP"], batch: List[OutboundEmail]) -> Tuple[Optional["smtplib.SMTP"], int, List[Tuple[OutboundEmail, Exception]]]:
+        """
+        Send a batch on the worker's connection (runs in a thread).
+
+        Returns the connection to reuse, the number of messages sent and the failures.
+        """
+        import smtplib
+        sent = 0
+        failures = []
+        for email in batch:
+            for reconnect in (False, True):
+                try:
+                    if connection is None:
+                        connection = self.smtp_client.connect()
+                    self.smtp_client.send_on(connection, email.subject, email.html_content, email.recipient)
+                    sent += 1
+                    break
+                except smtplib.SMTPServerDisconnected as e:
+                    # The server dropped an idle connection; reconnect once before counting a failure
+                    connection = None
+                    if reconnect:
+                        failures.append((email, e))
+                except (smtplib.SMTPException, OSError) as e:
+                    if not isinstance(e, smtplib.SMTPResponseException) and connection is not None:
+                        self._close(connection)
+                        connection = None
+                    failures.append((email, e))
+                    break
+        return connection, sent, failures
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """Whether the server rejected the message for good (a 5xx reply), so retrying can't help."""
+        import smtplib
+        if isinstance(error, smtplib.SMTPConnectError):
+            return False  # the greeting failed, not the message
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code >= 500
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(code >= 500 for code, _ in error.recipients.values())
+        return False
+
+    def _retry_later(self, email: OutboundEmail, error: Exception):
+        email.attempts += 1
+        if self._is_permanent(error):
+            self.failed += 1
+            logger.error("Email to %s was rejected permanently: %s", email.recipient, error)
+            return
+        if email.attempts > self.max_retries:
+            self.failed += 1
+            logger.error("Giving up on email to %s after %d attempts: %s", email.recipient, email.attempts, error)
+            return
+        delay = self.retry_backoff * 2 ** (email.attempts - 1)
+        logger.warning("Email to %s failed (%s), retrying in %.1fs", email.recipient, error, delay)
+        task = asyncio.create_task(self._requeue(email, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, email: OutboundEmail, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put(email)
+
+    @staticmethod
+    def _close(connection: "smtplib.SMTP"):
+        import smtplib
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+
+_email_queue: Optional[EmailQueue] = None
+
+def get_email_queue() -> EmailQueue:
+    """Return the process-wide email queue, built from the smtp_* and email_* settings; start() it before enqueueing."""
+    global _email_queue
+    if _email_queue is None:
+        smtp_client = SMTPClient(
+            server=settings.smtp_server,
+            port=settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            timeout=settings.smtp_timeout,
+        )
+        _email_queue = EmailQueue(
+            smtp_client,
+            workers=settings.email_queue_workers,
+            batch_size=settings.email_queue_batch_size,
+            max_size=settings.email_queue_max_size,
+            max_retries=settings.email_max_retries,
+            retry_backoff=settings.email_retry_backoff,
+            idle_timeout=settings.email_idle_timeout,
+        )
+    return _email_queue
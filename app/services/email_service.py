@@ -1,20 +1,31 @@
 # email_service.py
 from builtins import ValueError, dict, str
+import asyncio
+import logging
+from typing import Optional
 from settings.config import settings
+from app.services.email_queue import EmailQueue
+from app.utils.metrics import timed
 from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
 from app.models.user_model import User
 
+logger = logging.getLogger(__name__)
+
 class EmailService:
-    def __init__(self, template_manager: TemplateManager):
+    def __init__(self, template_manager: TemplateManager, email_queue: Optional[EmailQueue] = None):
         self.smtp_client = SMTPClient(
             server=settings.smtp_server,
             port=settings.smtp_port,
             username=settings.smtp_username,
-            password=settings.smtp_password
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            timeout=settings.smtp_timeout,
         )
         self.template_manager = template_manager
+        self.email_queue = email_queue
 
+    @timed("send_user_email")
     async def send_user_email(self, user_data: dict, email_type: str):
         subject_map = {
             'email_verification': "Verify Your Account",
@@ -26,7 +37,14 @@ class EmailService:
             raise ValueError("Invalid email type")
 
         html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        if self.email_queue is not None and self.email_queue.is_running:
+            try:
+                await self.email_queue.enqueue(subject_map[email_type], html_content, user_data['email'])
+                return
+            except asyncio.QueueFull:
+                logger.warning("Email queue full, sending to %s inline", user_data['email'])
+        # No background queue: still keep the blocking SMTP exchange off the event loop
+        await asyncio.to_thread(self.smtp_client.send_email, subject_map[email_type], html_content, user_data['email'])
 
     async def send_verification_email(self, user: User):
         verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
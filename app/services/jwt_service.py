@@ -1,5 +1,10 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import dict, float, int, isinstance, len, min, str
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
@@ -20,3 +25,63 @@ def decode_token(token: str):
         return decoded
     except jwt.PyJWTError:
         return None
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that `decode_token` has already accepted, keyed by the token's SHA-256 digest.
+
+    An entry is served only until the earlier of the token's `exp` and `ttl` seconds after it was
+    verified, so an expired token is never returned. Rejected tokens are not cached.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: int = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        # The cache is process-wide and may be shared with code running in worker threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def decode(self, token: str) -> Optional[dict]:
+        """Return the token's claims like `decode_token`, from the cache when possible."""
+        if self.max_size <= 0:
+            return decode_token(token)
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[key]
+            self.misses += 1
+
+        claims = decode_token(token)
+        if claims is None or not isinstance(claims.get("exp"), (int, float)):
+            return claims
+        expires_at = min(claims["exp"], time.time() + self.ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return dict(claims)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+verified_tokens = VerifiedTokenCache(settings.jwt_cache_size, settings.jwt_cache_ttl)
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """`decode_token` backed by the process-wide verified-token cache."""
+    return verified_tokens.decode(token)
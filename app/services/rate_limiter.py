@@ -0,0 +1,150 @@
+# rate_limiter.py
+from builtins import int, len, max, min
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from settings.config import settings
+from app.utils.redis_client import delete_prefixed, redis_from_url
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: int = 0  # whole seconds until the key is likely to be allowed again
+
+
+def _sliding_window(previous: int, current: int, limit: int, window: int, now: float) -> RateLimitResult:
+    """
+    Sliding window counter: the previous window's count is weighted by how much of it still
+    overlaps the sliding window ending now. `current` already includes this attempt.
+    """
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    if previous * weight + current <= limit:
+        return RateLimitResult(True)
+    if previous and current <= limit:
+        # Wait until enough of the previous window has slid out
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        wait = window - elapsed
+    return RateLimitResult(False, max(1, math.ceil(wait)))
+
+
+class InProcessRateLimiter:
+    """Sliding window counters local to the process; stale windows are pruned as keys are hit."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._windows: Dict[str, Tuple[int, int, int]] = {}  # key -> (window index, previous, current)
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            start, previous, current = self._windows.get(key, (index, 0, 0))
+            if start == index - 1:
+                previous, current = current, 0
+            elif start != index:
+                previous, current = 0, 0
+            current += 1
+            if len(self._windows) >= self.max_keys and key not in self._windows:
+                self._prune(index)
+            self._windows[key] = (index, previous, current)
+        return _sliding_window(previous, current, limit, window, now)
+
+    def _prune(self, index: int):
+        for key in [key for key, (start, _, _) in self._windows.items() if start < index - 1]:
+            del self._windows[key]
+        # Still full of live keys: drop the oldest inserted rather than grow without bound
+        while len(self._windows) >= self.max_keys:
+            del self._windows[next(iter(self._windows))]
+
+    async def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+
+class RedisRateLimiter:
+    """Sliding window counters shared between workers through Redis (INCR/EXPIRE, no scripts)."""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client  # must support transactional pipelines, since each hit is INCR + EXPIRE + GET
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        index = int(now // window)
+        current_key = f"{self.prefix}{key}:{index}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, window * 2)
+            pipe.get(f"{self.prefix}{key}:{index - 1}")
+            current, _, previous = await pipe.execute()
+        return _sliding_window(int(previous or 0), int(current), limit, window, now)
+
+    async def clear(self):
+        await delete_prefixed(self.client, self.prefix)
+
+
+class RateLimiter:
+    """
+    Limits attempts per client IP and per target email for the login and registration endpoints.
+
+    Every attempt counts, including rejected ones, so a client that keeps hammering stays blocked.
+    Checks happen before any database or bcrypt work.
+    """
+
+    def __init__(self, backend, window: int = 60, limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.backend = backend
+        self.window = window
+        self.limits = limits or {}  # scope -> (per IP, per email); 0 disables that key
+        self.rejected = 0
+
+    async def check(self, scope: str, client_ip: Optional[str], email: Optional[str]) -> RateLimitResult:
+        per_ip, per_email = self.limits.get(scope, (0, 0))
+        for kind, value, limit in (("ip", client_ip, per_ip), ("email", email, per_email)):
+            if limit and value:
+                result = await self.backend.hit(f"{scope}:{kind}:{value}", limit, self.window)
+                if not result.allowed:
+                    self.rejected += 1
+                    return result
+        return RateLimitResult(True)
+
+    async def clear(self):
+        await self.backend.clear()
+        self.rejected = 0
+
+
+def client_ip(forwarded_for: Optional[str], peer: Optional[str], trusted_hops: int) -> Optional[str]:
+    """
+    The client address as seen by the outermost trusted proxy.
+
+    Each proxy appends the address it received the request from to X-Forwarded-For, so with
+    `trusted_hops` proxies in front of the app the client is that many entries from the right.
+    Anything further left was sent by the client and can't be trusted.
+    """
+    if trusted_hops > 0 and forwarded_for:
+        entries = [entry.strip() for entry in forwarded_for.split(",") if entry.strip()]
+        if entries:
+            return entries[-min(trusted_hops, len(entries))]
+    return peer
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the process-wide rate limiter built from settings, or None if rate limiting is disabled."""
+    global _rate_limiter
+    if _rate_limiter is None and settings.rate_limit_enabled:
+        if settings.rate_limit_backend == "redis":
+            backend = RedisRateLimiter(redis_from_url(settings.rate_limit_redis_url))
+        else:
+            backend = InProcessRateLimiter()
+        _rate_limiter = RateLimiter(backend, window=settings.rate_limit_window, limits={
+            "login": (settings.login_rate_limit_per_ip, settings.login_rate_limit_per_email),
+            "register": (settings.register_rate_limit_per_ip, settings.register_rate_limit_per_email),
+        })
+    return _rate_limiter
@@ -0,0 +1,183 @@
+# user_cache.py
+from builtins import dict, int, isinstance, len, str
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import DateTime, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from settings.config import settings
+from app.models.user_model import User
+from app.utils.redis_client import delete_prefixed, redis_from_url
+
+
+class InProcessUserCache:
+    """Bounded LRU with per-entry expiry, local to the process."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisUserCache:
+    """Cache shared between workers through Redis; values are stored as JSON."""
+
+    def __init__(self, client, prefix: str = "users:"):
+        self.client = client  # only needs get/set/delete/scan_iter, so fakeredis works in tests
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int):
+        await self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        await delete_prefixed(self.client, self.prefix)
+
+
+class UserCache:
+    """
+    Read-through cache of user rows for `UserService` lookups by id and email.
+
+    A user's columns are stored as a JSON-safe dict under its id, and its email maps to that id, so
+    one invalidation by id covers both lookups. `hashed_password` is left out unless `include_password`
+    is set, so cached users must not be used to check passwords. Misses are never cached.
+    """
+
+    def __init__(self, backend, ttl: int = 60, include_password: bool = False):
+        self.backend = backend
+        self.ttl = ttl
+        self.include_password = include_password
+        self.hits = 0
+        self.misses = 0
+        excluded = set() if include_password else {"hashed_password"}
+        self._columns = [column for column in User.__table__.columns if column.key not in excluded]
+
+    @staticmethod
+    def _id_key(user_id) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email}"
+
+    def _dump(self, user: User) -> Dict[str, Any]:
+        values = {}
+        for column in self._columns:
+            value = getattr(user, column.key)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, uuid.UUID):
+                value = str(value)
+            elif isinstance(column.type, SQLAlchemyEnum) and value is not None:
+                value = value.value
+            values[column.key] = value
+        return values
+
+    def _load(self, values: Dict[str, Any]) -> User:
+        kwargs = {}
+        for column in self._columns:
+            value = values.get(column.key)
+            if value is not None:
+                if isinstance(column.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                elif isinstance(column.type, UUID):
+                    value = uuid.UUID(value)
+                elif isinstance(column.type, SQLAlchemyEnum):
+                    value = column.type.enum_class(value)
+            kwargs[column.key] = value
+        return User(**kwargs)
+
+    async def _attach(self, session: AsyncSession, values: Dict[str, Any]) -> User:
+        """Turn cached values into a persistent instance in `session` without touching the database."""
+        user = self._load(values)
+        make_transient_to_detached(user)
+        return await session.merge(user, load=False)
+
+    async def get_by_id(self, session: AsyncSession, user_id) -> Optional[User]:
+        values = await self.backend.get(self._id_key(user_id))
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return await self._attach(session, values)
+
+    async def get_by_email(self, session: AsyncSession, email: str) -> Optional[User]:
+        user_id = await self.backend.get(self._email_key(email))
+        values = await self.backend.get(self._id_key(user_id)) if user_id is not None else None
+        # The email may have changed since the pointer was written
+        if values is None or values.get("email") != email:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return await self._attach(session, values)
+
+    async def store(self, user: User):
+        await self.backend.set(self._id_key(user.id), self._dump(user), self.ttl)
+        await self.backend.set(self._email_key(user.email), str(user.id), self.ttl)
+
+    async def invalidate(self, user_id, emails: Iterable[Optional[str]] = ()):
+        """Drop a user's entry, plus the email pointers given (e.g. its old and new address)."""
+        keys = [self._id_key(user_id)] + [self._email_key(email) for email in emails if email]
+        cached = await self.backend.get(self._id_key(user_id))
+        if cached is not None and cached.get("email"):
+            keys.append(self._email_key(cached["email"]))
+        await self.backend.delete(*keys)
+
+    async def clear(self):
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_user_cache: Optional[UserCache] = None
+
+def get_user_cache() -> Optional[UserCache]:
+    """Return the process-wide user cache built from settings, or None if caching is disabled."""
+    global _user_cache
+    if _user_cache is None and settings.user_cache_backend != "none":
+        if settings.user_cache_backend == "redis":
+            backend = RedisUserCache(redis_from_url(settings.user_cache_redis_url))
+        else:
+            backend = InProcessUserCache(settings.user_cache_size)
+        _user_cache = UserCache(backend, ttl=settings.user_cache_ttl, include_password=settings.user_cache_include_password)
+    return _user_cache
@@ -1,29 +1,53 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import Exception, ValueError, bool, classmethod, int, isinstance, len, list, range, str, zip
 from datetime import datetime, timezone
+import asyncio
+import re
 import secrets
-from typing import Optional, Dict, List
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Optional, Dict, List, Sequence, Set, Tuple, Union
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import ARRAY, String, any_, delete, func, literal, null, or_, text, update, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from app.database import Database
 from app.dependencies import get_email_service, get_settings
 from app.models.user_model import User
 from app.schemas.user_schemas import UserCreate, UserUpdate
-from app.utils.security import generate_verification_token, hash_password, verify_password
+from app.utils.nickname_gen import generate_nickname, generate_nickname_candidates
+from app.utils.cursor import NEXT, PREV, decode_cursor, encode_cursor
+from app.utils.security import (
+    PASSWORD_REQUIREMENTS, PasswordHashingBusy, generate_verification_token, hash_password_async,
+    hash_passwords_async, is_strong_password, needs_rehash, verify_password_async,
+)
 from uuid import UUID
 from app.services.email_service import EmailService
+from app.services.user_cache import get_user_cache
 from app.models.user_model import UserRole
 import logging
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+class UserCreationError(RuntimeError):
+    """Raised when a user could not be created for a reason other than the email being taken."""
+
+
 class UserService:
+    # (expires_at, count) for the "cached" count strategy
+    _count_cache: Optional[Tuple[float, int]] = None
+    # Background password upgrades, kept referenced until they finish
+    _rehash_tasks: Set[asyncio.Task] = set()
+
     @classmethod
-    async def _execute_query(cls, session: AsyncSession, query):
+    async def _execute_query(cls, session: AsyncSession, query, commit: bool = False):
+        """Execute a statement, committing only when asked so plain reads cost a single round trip."""
         try:
             result = await session.execute(query)
-            await session.commit()
+            if commit:
+                await session.commit()
             return result
         except SQLAlchemyError as e:
             logger.error(f"Database error: {e}")
@@ -37,8 +61,50 @@ class UserService:
         return result.scalars().first() if result else None
 
     @classmethod
-    async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        return await cls._fetch_user(session, id=user_id)
+    async def _fetch_and_cache(cls, session: AsyncSession, **filters) -> Optional[User]:
+        user = await cls._fetch_user(session, **filters)
+        if user:
+            await cls._remember(user)
+        return user
+
+    @classmethod
+    async def _remember(cls, user: User):
+        cache = get_user_cache()
+        if cache:
+            await cache.store(user)
+
+    @classmethod
+    async def _invalidate(cls, user_id: UUID, *emails: Optional[str]):
+        cache = get_user_cache()
+        if cache:
+            await cache.invalidate(user_id, emails)
+
+    @classmethod
+    def _only_fields(cls, query, fields: Optional[Sequence[str]]):
+        """
+        Restrict a User query to the given columns (plus the primary key).
+
+        Any other attribute raises on access instead of lazy loading, so a partial user cannot
+        silently trigger extra queries.
+        """
+        if not fields:
+            return query
+        return query.options(load_only(*(getattr(User, field) for field in fields), raiseload=True))
+
+    @classmethod
+    async def get_by_id(cls, session: AsyncSession, user_id: UUID, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """
+        Look a user up by id, from the user cache when possible. Cached users lack hashed_password.
+
+        :param fields: Load only these columns. A cache hit still returns the whole cached user, but
+            a partial user loaded from the database is not cached.
+        """
+        cache = get_user_cache()
+        user = await cache.get_by_id(session, user_id) if cache else None
+        if user or not fields:
+            return user or await cls._fetch_and_cache(session, id=user_id)
+        result = await cls._execute_query(session, cls._only_fields(select(User).filter_by(id=user_id), fields))
+        return result.scalars().first() if result else None
 
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
@@ -46,25 +112,32 @@ class UserService:
 
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
-        return await cls._fetch_user(session, email=email)
+        """Look a user up by email, from the user cache when possible. Cached users lack hashed_password."""
+        cache = get_user_cache()
+        user = await cache.get_by_email(session, email) if cache else None
+        return user or await cls._fetch_and_cache(session, email=email)
 
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
+        """
+        Create a user and send the verification email.
+
+        :return: The new user, or None if the email is already registered or the data is invalid.
+        :raises UserCreationError: If no free nickname could be found or the insert failed otherwise.
+        """
         try:
             validated_data = UserCreate(**user_data).model_dump()
             existing_user = await cls.get_by_email(session, validated_data['email'])
             if existing_user:
                 logger.error("User with given email already exists.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            new_user = User(**validated_data)
-            new_user.verification_token = generate_verification_token()
-            new_nickname = validated_data['nickname']
-            while await cls.get_by_nickname(session, new_nickname):
-                new_nickname = validated_data['nickname']
-            new_user.nickname = new_nickname
-            session.add(new_user)
+            validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+            validated_data['verification_token'] = generate_verification_token()
+            new_user = await cls._insert_with_free_nickname(session, validated_data)
+            if new_user is None:
+                return None  # email registered concurrently
             await session.commit()
+            cls._count_cache = None
             await email_service.send_verification_email(new_user)
             
             return new_user
@@ -72,6 +145,139 @@ class UserService:
             logger.error(f"Validation error during user creation: {e}")
             return None
 
+    @classmethod
+    async def _insert_with_free_nickname(cls, session: AsyncSession, values: Dict[str, str]) -> Optional[User]:
+        """
+        Insert a user, replacing a taken nickname with a generated one.
+
+        The requested nickname and a few generated alternatives are checked in one query. The insert
+        itself uses ON CONFLICT (nickname) DO NOTHING, so a nickname claimed concurrently just moves
+        on to the next candidate. Returns None if the email is already registered.
+
+        :raises UserCreationError: If every attempt hit a taken nickname, or the insert violated
+            something other than the unique email.
+        """
+        preferred = values.pop('nickname')
+        candidates = [preferred] + generate_nickname_candidates(settings.nickname_candidates)
+        query = select(User.nickname).where(User.nickname == any_(literal(candidates, ARRAY(String))))
+        result = await cls._execute_query(session, query)
+        taken = set(result.scalars().all()) if result else set()
+        available = [nickname for nickname in candidates if nickname not in taken]
+
+        for attempt in range(settings.nickname_max_attempts):
+            nickname = available[attempt] if attempt < len(available) else generate_nickname()
+            query = (
+                pg_insert(User).values(nickname=nickname, **values)
+                .on_conflict_do_nothing(index_elements=[User.nickname])
+                .returning(User)
+            )
+            try:
+                result = await session.execute(query)
+            except IntegrityError as e:
+                await session.rollback()
+                # Registered concurrently since the lookup in create(); anything else is a real fault
+                if await cls._fetch_user(session, email=values['email']):
+                    logger.error("User with given email already exists.")
+                    return None
+                raise UserCreationError("Could not insert the user") from e
+            new_user = result.scalars().first()
+            if new_user is not None:
+                if nickname != preferred:
+                    logger.info(f"Nickname {preferred} is taken, assigned {nickname} instead.")
+                return new_user
+        raise UserCreationError("Could not allocate a free nickname")
+
+    @classmethod
+    async def bulk_create(cls, session: AsyncSession, records: AsyncIterable[Tuple[int, Union[Dict[str, str], ValueError]]],
+                          email_service: EmailService, batch_size: int = 500) -> List[Dict]:
+        """
+        Create users from a stream of (row_number, record) pairs, one batch at a time.
+
+        Each batch is validated, has its passwords hashed in parallel on the hashing pool and is
+        written with a single multi-row INSERT ... ON CONFLICT DO NOTHING, then committed. Records
+        that failed to parse can be passed as a ValueError and are reported as invalid.
+
+        :return: One report entry per row with its status ('created', 'duplicate' or 'invalid').
+        """
+        report = []
+        batch = []
+        async for row, record in records:
+            batch.append((row, record))
+            if len(batch) >= batch_size:
+                report.extend(await cls._bulk_create_batch(session, batch, email_service))
+                batch = []
+        if batch:
+            report.extend(await cls._bulk_create_batch(session, batch, email_service))
+        report.sort(key=lambda entry: entry['row'])
+        return report
+
+    @classmethod
+    async def _bulk_create_batch(cls, session: AsyncSession, batch: List[Tuple[int, Union[Dict[str, str], ValueError]]],
+                                 email_service: EmailService) -> List[Dict]:
+        report = []
+        pending: Dict[str, Tuple[int, Dict[str, str]]] = {}  # keyed by email, which is unique
+        for row, record in batch:
+            if isinstance(record, ValueError):
+                report.append({'row': row, 'status': 'invalid', 'errors': [str(record)]})
+                continue
+            try:
+                values = UserCreate(**record).model_dump()
+            except ValidationError as e:
+                errors = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+                report.append({'row': row, 'status': 'invalid', 'email': record.get('email'), 'errors': errors})
+                continue
+            if not is_strong_password(values['password']):
+                report.append({'row': row, 'status': 'invalid', 'email': values['email'], 'errors': [PASSWORD_REQUIREMENTS]})
+                continue
+            if values['email'] in pending:
+                report.append({'row': row, 'status': 'duplicate', 'email': values['email']})
+                continue
+            pending[values['email']] = (row, values)
+        if not pending:
+            return report
+
+        hashes = await hash_passwords_async([values.pop('password') for _, values in pending.values()])
+        for (_, values), hashed_password in zip(pending.values(), hashes):
+            values['hashed_password'] = hashed_password
+            values['verification_token'] = generate_verification_token()
+
+        created = []
+        for attempt in range(settings.nickname_max_attempts):
+            query = pg_insert(User).values([values for _, values in pending.values()]).on_conflict_do_nothing().returning(User)
+            result = await cls._execute_query(session, query)
+            if result is None:
+                # The transaction was rolled back, taking this batch's earlier inserts with it
+                failed = [(entry['row'], entry) for entry in report if entry['status'] == 'created'] + list(pending.values())
+                report = [entry for entry in report if entry['status'] != 'created']
+                for row, values in failed:
+                    report.append({'row': row, 'status': 'invalid', 'email': values['email'], 'errors': ["Database error"]})
+                return report
+            for user in result.scalars().all():
+                row, _ = pending.pop(user.email)
+                report.append({'row': row, 'status': 'created', 'id': user.id, 'email': user.email})
+                created.append(user)
+            if not pending:
+                break
+            # Rows skipped by ON CONFLICT either have a registered email or collided on nickname
+            query = select(User.email).where(User.email == any_(literal(list(pending), ARRAY(String))))
+            result = await cls._execute_query(session, query)
+            for email in (result.scalars().all() if result else []):
+                row, _ = pending.pop(email)
+                report.append({'row': row, 'status': 'duplicate', 'email': email})
+            if not pending:
+                break
+            for nickname, (_, values) in zip(generate_nickname_candidates(len(pending)), pending.values()):
+                values['nickname'] = nickname
+        for row, values in pending.values():
+            report.append({'row': row, 'status': 'invalid', 'email': values['email'], 'errors': ["Could not allocate a free nickname"]})
+
+        await session.commit()
+        if created:
+            cls._count_cache = None
+        for user in created:
+            await email_service.send_verification_email(user)
+        return report
+
     @classmethod
     async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
         try:
@@ -79,37 +285,154 @@ class UserService:
             validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+            # RETURNING hands back the updated row, refreshing any copy already in the session
+            query = (
+                update(User).where(User.id == user_id).values(**validated_data)
+                .returning(User).execution_options(populate_existing=True)
+            )
+            result = await cls._execute_query(session, query, commit=True)
+            updated_user = result.scalars().first() if result else None
             if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
+                await cls._invalidate(user_id, updated_user.email)
                 logger.info(f"User {user_id} updated successfully.")
                 return updated_user
             else:
                 logger.error(f"User {user_id} not found after update attempt.")
             return None
+        except PasswordHashingBusy:
+            raise
         except Exception as e:  # Broad exception handling for debugging
             logger.error(f"Error during user update: {e}")
             return None
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if not user:
+        query = delete(User).where(User.id == user_id).returning(User.id)
+        result = await cls._execute_query(session, query, commit=True)
+        if not result or result.scalar() is None:
             logger.info(f"User with ID {user_id} not found.")
             return False
-        await session.delete(user)
-        await session.commit()
+        cls._count_cache = None
+        await cls._invalidate(user_id)
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
+    def _apply_filters(cls, query, filters: Optional[Dict[str, Any]]):
+        """
+        Narrow a User query by listing filters, ignoring any that are None.
+
+        Supported keys: role, is_locked, email_verified, created_after (inclusive), created_before
+        (exclusive) and search, a case-sensitive prefix matched against nickname or email. Each is
+        backed by an index on users, see the model's __table_args__.
+        """
+        if not filters:
+            return query
+        if filters.get('role') is not None:
+            query = query.where(User.role == filters['role'])
+        if filters.get('is_locked') is not None:
+            query = query.where(User.is_locked == filters['is_locked'])
+        if filters.get('email_verified') is not None:
+            query = query.where(User.email_verified == filters['email_verified'])
+        if filters.get('created_after') is not None:
+            query = query.where(User.created_at >= filters['created_after'])
+        if filters.get('created_before') is not None:
+            query = query.where(User.created_at < filters['created_before'])
+        if filters.get('search'):
+            # Escape LIKE wildcards and keep the pattern a plain prefix so the text_pattern_ops indexes apply
+            pattern = re.sub(r'([\\%_])', r'\\\1', filters['search']) + '%'
+            query = query.where(or_(User.nickname.like(pattern, escape='\\'), User.email.like(pattern, escape='\\')))
+        return query
+
+    @classmethod
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                         filters: Optional[Dict[str, Any]] = None) -> List[User]:
+        query = cls._apply_filters(cls._only_fields(select(User), fields), filters)
+        query = query.order_by(User.created_at, User.id).offset(skip).limit(limit)
         result = await cls._execute_query(session, query)
         return result.scalars().all() if result else []
 
+    @classmethod
+    async def list_users_with_total(cls, session: AsyncSession, skip: int = 0, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                                    filters: Optional[Dict[str, Any]] = None) -> Tuple[List[User], Optional[int]]:
+        """
+        Fetch a page of users together with the total row count in a single round trip.
+
+        The total comes from a `count(*) OVER ()` window on the page query, so it is None when the
+        page is empty (e.g. `skip` past the end) and the caller has to count separately.
+        """
+        query = cls._apply_filters(cls._only_fields(select(User, func.count().over().label("total")), fields), filters)
+        query = query.order_by(User.created_at, User.id).offset(skip).limit(limit)
+        result = await cls._execute_query(session, query)
+        rows = result.all() if result else []
+        if not rows:
+            return [], None
+        return [row[0] for row in rows], rows[0][1]
+
+    @classmethod
+    async def list_users_by_cursor(cls, session: AsyncSession, cursor: Optional[str] = None, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                                   filters: Optional[Dict[str, Any]] = None) -> Tuple[List[User], Optional[str], Optional[str]]:
+        """
+        Fetch a page of users using keyset pagination ordered by (created_at, id).
+
+        :param session: The AsyncSession instance for database access.
+        :param cursor: An opaque cursor from a previous page, or None for the first page.
+        :param limit: The maximum number of users to return.
+        :param fields: Load only these columns; created_at and id are always loaded for the cursors.
+        :param filters: Listing filters, see `_apply_filters`. Cursors are only meaningful with the same filters.
+        :return: The users on the page plus the cursors for the next and previous pages.
+        :raises ValueError: If the cursor is malformed.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        key = tuple_(User.created_at, User.id)
+        query = cls._apply_filters(cls._only_fields(select(User), [*fields, "created_at"] if fields else None), filters)
+        if position and position[0] == PREV:
+            query = query.where(key < tuple_(position[1], position[2])).order_by(User.created_at.desc(), User.id.desc())
+        else:
+            if position:
+                query = query.where(key > tuple_(position[1], position[2]))
+            query = query.order_by(User.created_at, User.id)
+        # Fetch one extra row to learn whether another page exists in the direction of travel
+        result = await cls._execute_query(session, query.limit(limit + 1))
+        users = list(result.scalars().all()) if result else []
+        has_more = len(users) > limit
+        users = users[:limit]
+
+        if position and position[0] == PREV:
+            users.reverse()
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id, NEXT) if users else encode_cursor(position[1], position[2], NEXT)
+            prev_cursor = encode_cursor(users[0].created_at, users[0].id, PREV) if has_more else None
+        else:
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id, NEXT) if has_more else None
+            if position is None:
+                prev_cursor = None
+            elif users:
+                prev_cursor = encode_cursor(users[0].created_at, users[0].id, PREV)
+            else:
+                prev_cursor = encode_cursor(position[1], position[2], PREV)
+        return users, next_cursor, prev_cursor
+
+    @classmethod
+    async def stream_users(cls, session: AsyncSession, columns: Sequence[str], batch_size: int = 1000,
+                           filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Row]]:
+        """
+        Stream users as plain rows through a server-side cursor, `batch_size` rows at a time.
+
+        Only the requested columns are selected and no ORM objects are built, so memory stays flat
+        however many rows match.
+
+        :param columns: Names of User columns to select, in output order.
+        :param filters: Listing filters, see `_apply_filters`.
+        """
+        query = (
+            cls._apply_filters(select(*(getattr(User, column) for column in columns)), filters)
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
@@ -117,25 +440,89 @@ class UserService:
 
     @classmethod
     async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
-        return None
+        user, _ = await cls.authenticate_user(session, email, password)
+        return user
+
+    @classmethod
+    async def _rehash_password(cls, user_id: UUID, password: str, old_hash: str) -> bool:
+        """
+        Re-hash a just-verified password at the configured cost, in a session of its own since the
+        request's session may be closed by now. Only replaces `old_hash`, so a password changed
+        in the meantime is left alone. Returns whether the hash was replaced.
+        """
+        try:
+            new_hash = await hash_password_async(password)
+        except PasswordHashingBusy:
+            return False  # the next login tries again
+        except ValueError as e:
+            logger.warning("Could not rehash password for user %s: %s", user_id, e)
+            return False
+        async with Database.get_session_factory()() as session:
+            query = update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash)
+            result = await cls._execute_query(session, query, commit=True)
+        if not result or not result.rowcount:
+            return False
+        await cls._invalidate(user_id)
+        logger.info("Upgraded password hash for user %s", user_id)
+        return True
+
+    @classmethod
+    async def authenticate_user(cls, session: AsyncSession, email: str, password: str) -> Tuple[Optional[User], bool]:
+        """
+        Check a login attempt with a single user lookup.
+
+        :return: The user on success (None otherwise), and whether the account is locked.
+        """
+        cache = get_user_cache()
+        if cache and cache.include_password:
+            user = await cls.get_by_email(session, email)
+        else:
+            # Cached users carry no password hash
+            user = await cls._fetch_user(session, email=email)
+        if not user:
+            return None, False
+        if user.is_locked:
+            return None, True
+        if user.email_verified is False:
+            return None, False
+        if await verify_password_async(password, user.hashed_password):
+            # Guarded on is_locked so a lockout committed by a concurrent request still wins
+            query = (
+                update(User)
+                .where(User.id == user.id, User.is_locked.isnot(True))
+                .values(failed_login_attempts=0, last_login_at=func.now())
+                .returning(User).execution_options(populate_existing=True)
+            )
+            result = await cls._execute_query(session, query, commit=True)
+            logged_in_user = result.scalars().first() if result else None
+            if logged_in_user:
+                await cls._remember(logged_in_user)
+                if needs_rehash(logged_in_user.hashed_password):
+                    # Off the request path: the response doesn't wait for another bcrypt round
+                    task = asyncio.create_task(cls._rehash_password(logged_in_user.id, password, logged_in_user.hashed_password))
+                    cls._rehash_tasks.add(task)
+                    task.add_done_callback(cls._rehash_tasks.discard)
+                return logged_in_user, False
+            await cls._invalidate(user.id)
+            return None, True
+        # Increment and lock in one statement so concurrent failures cannot lose updates
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        query = (
+            update(User)
+            .where(User.id == user.id)
+            .values(
+                failed_login_attempts=attempts,
+                is_locked=or_(User.is_locked.is_(True), attempts >= settings.max_login_attempts),
+            )
+            .returning(User).execution_options(populate_existing=True)
+        )
+        result = await cls._execute_query(session, query, commit=True)
+        failed_user = result.scalars().first() if result else None
+        if failed_user:
+            await cls._remember(failed_user)
+        else:
+            await cls._invalidate(user.id)
+        return None, False
 
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
@@ -145,49 +532,100 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
-        user = await cls.get_by_id(session, user_id)
+        hashed_password = await hash_password_async(new_password)
+        user = await cls._fetch_user(session, id=user_id)
         if user:
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
             await session.commit()
+            await cls._invalidate(user_id)
             return True
         return False
 
     @classmethod
     async def verify_email_with_token(cls, session: AsyncSession, user_id: UUID, token: str) -> bool:
-        user = await cls.get_by_id(session, user_id)
+        user = await cls._fetch_user(session, id=user_id)
         if user and user.verification_token == token:
             user.email_verified = True
             user.verification_token = None  # Clear the token once used
             user.role = UserRole.AUTHENTICATED
             session.add(user)
             await session.commit()
+            await cls._invalidate(user_id)
             return True
         return False
 
     @classmethod
-    async def count(cls, session: AsyncSession) -> int:
+    async def count(cls, session: AsyncSession, filters: Optional[Dict[str, Any]] = None) -> int:
         """
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
+        :param filters: Optional listing filters, see `_apply_filters`.
         :return: The count of users.
         """
-        query = select(func.count()).select_from(User)
+        query = cls._apply_filters(select(func.count()).select_from(User), filters)
         result = await session.execute(query)
         count = result.scalar()
         return count
+
+    @classmethod
+    async def count_estimated(cls, session: AsyncSession) -> Optional[int]:
+        """
+        Estimate the number of users from the planner statistics in pg_class.
+
+        :return: The estimate, or None if the table has never been analyzed.
+        """
+        query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)")
+        result = await cls._execute_query(session, query.bindparams(table=User.__tablename__))
+        estimate = result.scalar() if result else None
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    @classmethod
+    async def count_cached(cls, session: AsyncSession, ttl: int) -> Tuple[int, bool]:
+        """
+        Count users, reusing a count taken within the last `ttl` seconds.
+
+        :return: The count and whether it was served from the cache (and may be stale).
+        """
+        now = time.monotonic()
+        if cls._count_cache is not None and cls._count_cache[0] > now:
+            return cls._count_cache[1], True
+        count = await cls.count(session)
+        cls._count_cache = (now + ttl, count)
+        return count, False
+
+    @classmethod
+    async def count_with_strategy(cls, session: AsyncSession, strategy: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[int, bool]:
+        """
+        Count users using one of the configured count strategies.
+
+        :param strategy: 'exact', 'cached' or 'estimated'. Any other value (including 'window',
+            which only applies to offset page fetches) falls back to an exact count.
+        :param filters: Listing filters. The cached and estimated strategies only know the table
+            total, so filtered counts are always exact.
+        :return: The count and whether it is an estimate rather than an exact figure.
+        """
+        if filters:
+            return await cls.count(session, filters), False
+        if strategy == "cached":
+            return await cls.count_cached(session, settings.user_count_cache_ttl)
+        if strategy == "estimated":
+            estimate = await cls.count_estimated(session)
+            if estimate is not None:
+                return estimate, True
+        return await cls.count(session), False
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
-        user = await cls.get_by_id(session, user_id)
+        user = await cls._fetch_user(session, id=user_id)
         if user and user.is_locked:
             user.is_locked = False
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
             await session.commit()
+            await cls._invalidate(user_id)
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,107 @@
+# startup_report.py
+"""
+Break down where import time goes when the application starts.
+
+    python -m app.startup_report [--module app.main] [--top 25] [--json]
+
+Imports the module in a fresh interpreter with `-X importtime` and summarizes the result: the
+total, the direct imports of the module, the top-level packages and the single modules that
+cost the most. Use it to check that heavy dependencies stay off the startup path.
+"""
+from builtins import dict, int, len, list, print, str
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse `-X importtime` output; lines that aren't import timings are ignored."""
+    timings = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def measure(module: str) -> List[ImportTiming]:
+    """Import `module` in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(timings: List[ImportTiming], module: str, top: int = 25) -> Dict[str, object]:
+    target: Optional[ImportTiming] = next((t for t in timings if t.module == module and t.depth == 0), None)
+    packages: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        packages[timing.module.split(".")[0]] += timing.self_us
+    # Timings are printed after their children, so the module's direct imports are the depth-1
+    # entries between the previous top-level entry and the module's own line
+    direct: List[ImportTiming] = []
+    for timing in timings:
+        if timing.depth == 0:
+            if timing is target:
+                break
+            direct = []
+        elif timing.depth == 1:
+            direct.append(timing)
+    return {
+        "module": module,
+        "total_ms": round(target.cumulative_us / 1000, 1) if target else None,
+        "interpreter_ms": round(sum(t.cumulative_us for t in timings if t.depth == 0) / 1000, 1),
+        "direct_imports": [(t.module, round(t.cumulative_us / 1000, 1)) for t in sorted(direct, key=lambda t: -t.cumulative_us)],
+        "packages": [(name, round(us / 1000, 1)) for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]],
+        "modules": [(t.module, round(t.self_us / 1000, 1)) for t in sorted(timings, key=lambda t: -t.self_us)[:top]],
+    }
+
+
+def print_report(summary: Dict[str, object]):
+    print(f"{summary['module']}: {summary['total_ms']} ms (all imports incl. interpreter: {summary['interpreter_ms']} ms)")
+    for title, key in (
+        ("Direct imports (cumulative)", "direct_imports"),
+        ("Top-level packages (self time, summed)", "packages"),
+        ("Slowest modules (self time)", "modules"),
+    ):
+        print(f"\n{title}")
+        for name, ms in summary[key]:
+            print(f"  {ms:>9.1f} ms  {name}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report where import time goes at startup.")
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(measure(args.module), args.module, args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
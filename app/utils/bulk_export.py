@@ -0,0 +1,46 @@
+from builtins import dict, isinstance, map, str, zip
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Sequence
+from uuid import UUID
+
+# Columns written by the user export, in output order. Credentials and tokens are never exported.
+EXPORT_COLUMNS = (
+    "id", "nickname", "email", "first_name", "last_name", "bio", "profile_picture_url",
+    "linkedin_profile_url", "github_profile_url", "role", "is_professional", "email_verified",
+    "is_locked", "last_login_at", "created_at", "updated_at",
+)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    """Convert a column value to a JSON/CSV friendly scalar."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def ndjson_lines(batches: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[str]:
+    """Encode batches of rows (in EXPORT_COLUMNS order) as JSON Lines, one chunk per batch."""
+    async for rows in batches:
+        yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row)))) + "\n" for row in rows)
+
+
+async def csv_lines(batches: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[str]:
+    """Encode batches of rows (in EXPORT_COLUMNS order) as CSV with a header, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
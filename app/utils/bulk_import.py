@@ -0,0 +1,65 @@
+from builtins import ValueError, dict, enumerate, isinstance, str
+import csv
+import json
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+JSON_LINES_CONTENT_TYPES = {"application/x-ndjson", "application/jsonl", "application/x-jsonlines", "application/json-lines"}
+
+# A parsed record, or the reason the line could not be parsed
+ImportRecord = Union[Dict[str, str], ValueError]
+
+
+def import_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type to 'csv' or 'jsonl', or None if it is not an import format."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if media_type in JSON_LINES_CONTENT_TYPES:
+        return "jsonl"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_import_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, ImportRecord]]:
+    """
+    Parse JSON Lines or CSV into (row_number, record) pairs, numbering data rows from 1.
+
+    Blank lines are skipped. Empty CSV cells are dropped so schema defaults apply. CSV records
+    must fit on one line (no newlines inside quoted cells), and malformed quoting is reported
+    as an invalid row rather than guessed at.
+    """
+    header = None
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip() for name in next(csv.reader([line.lstrip("\ufeff")]))]
+            continue
+        row += 1
+        try:
+            if fmt == "csv":
+                values = next(csv.reader([line], strict=True))
+                if len(values) != len(header):
+                    raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                record = {name: value for name, value in zip(header, values) if value != ""}
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Each line must be a JSON object")
+        except (ValueError, csv.Error) as e:
+            yield row, ValueError(f"Could not parse row: {e}")
+            continue
+        yield row, record
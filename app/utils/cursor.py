@@ -0,0 +1,45 @@
+from builtins import ValueError, str
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(created_at: datetime, user_id: UUID, direction: str = NEXT) -> str:
+    """
+    Encode a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        created_at (datetime): The created_at value of the boundary row.
+        user_id (UUID): The id of the boundary row, used to break ties on created_at.
+        direction (str): Whether the cursor pages forward ("next") or backward ("prev").
+
+    Returns:
+        str: The encoded cursor.
+    """
+    payload = json.dumps([direction, created_at.isoformat(), str(user_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime, UUID]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Returns:
+        Tuple[str, datetime, UUID]: The direction, created_at and id of the boundary row.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, created_at, user_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if direction not in (NEXT, PREV):
+            raise ValueError(f"Unknown cursor direction {direction!r}")
+        return direction, datetime.fromisoformat(created_at), UUID(user_id)
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
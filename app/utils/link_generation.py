@@ -1,5 +1,5 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
+from typing import List, Callable, Optional
 from urllib.parse import urlencode
 from uuid import UUID
 
@@ -14,7 +14,8 @@ def create_link(rel: str, href: str, method: str = "GET", action: str = None) ->
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    # The href is built from the request URL, so skip re-parsing it as an HttpUrl
+    return PaginationLink.model_construct(rel=rel, href=f"{base_url}?{query_string}")
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
@@ -46,3 +47,30 @@ def generate_pagination_links(request: Request, skip: int, limit: int, total_ite
         links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
 
     return links
+
+def create_cursor_pagination_link(rel: str, base_url: str, cursor: str, limit: int, extra_params: Optional[dict] = None) -> PaginationLink:
+    query_string = urlencode({'cursor': cursor, 'limit': limit, **(extra_params or {})})
+    return PaginationLink.model_construct(rel=rel, href=f"{base_url}?{query_string}")
+
+def generate_cursor_pagination_links(request: Request, cursor: Optional[str], limit: int, next_cursor: Optional[str], prev_cursor: Optional[str],
+                                     extra_params: Optional[dict] = None) -> List[PaginationLink]:
+    """
+    Generate navigation links for keyset pagination.
+
+    Cursor pages have no fixed position, so only self/first plus next/prev (when they exist) are emitted.
+    `extra_params` (e.g. a fieldset) are carried over to every link.
+    """
+    base_url = str(request.url).split("?", 1)[0]
+    links = [
+        create_cursor_pagination_link("self", base_url, cursor or "", limit, extra_params),
+        create_cursor_pagination_link("first", base_url, "", limit, extra_params),
+    ]
+
+    if next_cursor:
+        links.append(create_cursor_pagination_link("next", base_url, next_cursor, limit, extra_params))
+
+    if prev_cursor:
+        links.append(create_cursor_pagination_link("prev", base_url, prev_cursor, limit, extra_params))
+
+    return links
+
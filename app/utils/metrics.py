@@ -0,0 +1,232 @@
+# metrics.py
+"""
+Request latency and span metrics, exported in the Prometheus text format.
+
+`MetricsMiddleware` times each request by route template and collects the spans recorded while it
+runs (SQL queries, bcrypt, template rendering, email sending) into histograms and a `Server-Timing`
+response header. Spans are recorded with `span()` or `timed()`; the current request is found
+through a context variable, so code outside a request only feeds the process-wide histograms.
+"""
+from builtins import dict, float, int, isinstance, len, list, str, tuple
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative histogram with labels, safe to observe from worker threads."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        # Each series is [per-bucket counts (plus +Inf), count, sum]
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def get(self, *labels: str) -> Optional[Tuple[int, float]]:
+        """Return the (count, sum) observed for `labels`, or None if there were none."""
+        with self._lock:
+            series = self._series.get(labels)
+            return (series[1], series[2]) if series is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, [list(values[0]), values[1], values[2]]) for labels, values in self._series.items())
+        for labels, (bucket_counts, count, total) in series:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_count{suffix} {count}")
+            lines.append(f"{self.name}_sum{suffix} {total!r}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: List[Histogram] = []
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        histogram = Histogram(*args, **kwargs)
+        self.histograms.append(histogram)
+        return histogram
+
+    def render(self) -> str:
+        return "\n".join(line for histogram in self.histograms for line in histogram.render()) + "\n"
+
+    def clear(self):
+        for histogram in self.histograms:
+            histogram.clear()
+
+
+registry = MetricsRegistry()
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route", "status"))
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS)
+REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route"))
+SPAN_DURATION = registry.histogram(
+    "app_span_duration_seconds", "Time spent in instrumented operations.", ("span",))
+
+
+class RequestTimings:
+    """Spans recorded while handling one request, as name -> [count, seconds]."""
+
+    def __init__(self):
+        self.spans: Dict[str, list] = {}
+
+    def add(self, name: str, seconds: float):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"app;dur={total * 1000:.2f}"]
+        for name, (count, seconds) in self.spans.items():
+            parts.append(f'{name};dur={seconds * 1000:.2f};desc="{count}x"')
+        return ", ".join(parts)
+
+
+_current_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def record_span(name: str, seconds: float):
+    """Record `seconds` spent in `name` for the current request, if any, and the process-wide histogram."""
+    SPAN_DURATION.observe(seconds, name)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator recording each call of a function or coroutine function as span `name`."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_span("db", time.perf_counter() - conn.info["query_start_time"].pop())
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        record_span("db", time.perf_counter() - conn.info["query_start_time"].pop())
+
+
+def instrument_engine(engine):
+    """Record every SQL statement run on `engine` (sync or async) as a `db` span."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template, with the SQL statements issued
+    while handling it, and optionally reporting the request's spans in a `Server-Timing` header.
+    """
+
+    def __init__(self, app, server_timing: bool = True, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.server_timing = server_timing
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+            elapsed = time.perf_counter() - start
+            # The router stores the matched route in the scope; its template keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, route, str(status))
+            queries, db_seconds = timings.spans.get("db", (0, 0.0))
+            REQUEST_DB_QUERIES.observe(queries, method, route)
+            REQUEST_DB_DURATION.observe(db_seconds, method, route)
@@ -1,10 +1,42 @@
-from builtins import str
-import random
+from builtins import int, range, str
+import secrets
+from typing import List
+
+# Words are at most 7 characters so "<adjective>_<animal>_<9999>" stays within the 20 character nickname limit.
+# 64 adjectives x 64 animals x 10,000 numbers gives roughly 41 million nicknames.
+ADJECTIVES = [
+    "clever", "jolly", "brave", "sly", "gentle", "swift", "calm", "bold",
+    "bright", "eager", "fancy", "happy", "keen", "lively", "lucky", "merry",
+    "noble", "proud", "quick", "quiet", "witty", "zesty", "agile", "amber",
+    "azure", "breezy", "bubbly", "cosmic", "crafty", "crisp", "daring", "dreamy",
+    "dusky", "epic", "fierce", "fluffy", "frosty", "fuzzy", "glossy", "golden",
+    "grand", "hardy", "humble", "icy", "jazzy", "kind", "loyal", "lunar",
+    "mellow", "mighty", "misty", "nimble", "peppy", "plucky", "polar", "rapid",
+    "rustic", "sandy", "shiny", "silent", "snowy", "sunny", "tidy", "vivid",
+]
+ANIMALS = [
+    "panda", "fox", "raccoon", "koala", "lion", "tiger", "otter", "badger",
+    "beaver", "bison", "camel", "cheetah", "cobra", "condor", "cougar", "coyote",
+    "crane", "dingo", "dolphin", "donkey", "eagle", "falcon", "ferret", "finch",
+    "gazelle", "gecko", "gibbon", "giraffe", "gopher", "hawk", "heron", "hippo",
+    "hyena", "ibis", "iguana", "impala", "jackal", "jaguar", "kiwi", "lemur",
+    "llama", "lynx", "macaw", "marmot", "meerkat", "moose", "narwhal", "newt",
+    "ocelot", "orca", "osprey", "owl", "parrot", "pelican", "penguin", "puffin",
+    "puma", "quokka", "rabbit", "raven", "salmon", "seal", "sloth", "walrus",
+]
 
 
 def generate_nickname() -> str:
     """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+    number = secrets.randbelow(10000)
+    return f"{secrets.choice(ADJECTIVES)}_{secrets.choice(ANIMALS)}_{number}"
+
+
+def generate_nickname_candidates(count: int) -> List[str]:
+    """Generate `count` distinct nicknames to check for availability in a single query."""
+    candidates = []
+    while len(candidates) < count:
+        nickname = generate_nickname()
+        if nickname not in candidates:
+            candidates.append(nickname)
+    return candidates
@@ -0,0 +1,27 @@
+from builtins import len, range, str
+from typing import List
+
+
+def redis_from_url(url: str):
+    """
+    Build a redis.asyncio client for `url`.
+
+    redis is imported here rather than at module level so it is only required when a deployment
+    configures one of the Redis backends.
+    """
+    from redis.asyncio import Redis
+    return Redis.from_url(url)
+
+
+async def delete_prefixed(client, prefix: str, batch_size: int = 500) -> int:
+    """
+    Delete every key starting with `prefix` and return how many were removed.
+
+    Keys are found with SCAN, which doesn't block the server the way KEYS would, and deleted
+    in batches once the scan is done, one round trip per batch rather than per key.
+    """
+    keys: List[bytes] = [key async for key in client.scan_iter(match=f"{prefix}*", count=batch_size)]
+    deleted = 0
+    for start in range(0, len(keys), batch_size):
+        deleted += await client.delete(*keys[start:start + batch_size])
+    return deleted
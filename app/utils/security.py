@@ -1,19 +1,29 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, RuntimeError, ValueError, bool, int, str
+import asyncio
+import collections
+import contextvars
+import re
 import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
 import bcrypt
 from logging import getLogger
+from settings.config import settings
+from app.utils.metrics import span, timed
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+@timed("hash_password")
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Hashes a password using bcrypt with a specified cost factor.
     
     Args:
         password (str): The plain text password to hash.
         rounds (int): The cost factor that determines the computational cost of hashing.
+            Defaults to `settings.password_hash_rounds`.
 
     Returns:
         str: The hashed password.
@@ -22,13 +32,14 @@ def hash_password(password: str, rounds: int = 12) -> str:
         ValueError: If hashing the password fails.
     """
     try:
-        salt = bcrypt.gensalt(rounds=rounds)
+        salt = bcrypt.gensalt(rounds=settings.password_hash_rounds if rounds is None else rounds)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
     except Exception as e:
         logger.error("Failed to hash password: %s", e)
         raise ValueError("Failed to hash password") from e
 
+@timed("verify_password")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies a plain text password against a hashed password.
@@ -49,5 +60,178 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+def hash_cost(hashed_password: str) -> Optional[int]:
+    """The cost factor stored in a bcrypt hash (`$2b$<cost>$...`), or None if it isn't one."""
+    parts = hashed_password.split("$") if hashed_password else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def needs_rehash(hashed_password: str, rounds: Optional[int] = None) -> bool:
+    """Whether a hash was made with a different cost than `rounds` (default: the configured cost)."""
+    return hash_cost(hashed_password) != (settings.password_hash_rounds if rounds is None else rounds)
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the password hashing pool has no room for another job."""
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt work on a bounded thread or process pool so it never blocks the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may wait for a
+    worker. Anything beyond that is rejected with ``PasswordHashingBusy`` instead of piling
+    up behind the CPU-bound work, unless the caller asks to wait for a free slot; waiters
+    get slots in arrival order.
+    """
+
+    def __init__(self, executor: str = "thread", max_workers: int = 4, max_queue: int = 64):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.executor_kind = executor
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._waiters: "collections.deque[asyncio.Future]" = collections.deque()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently running or waiting for a worker."""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func, *args, wait: bool = False):
+        """
+        Run ``func(*args)`` on the pool. If the pool is saturated the job is rejected, or with
+        ``wait`` it queues for the next slot to free up, first come first served.
+        """
+        if self._pending >= self.capacity:
+            if not wait:
+                logger.warning("Password hashing pool saturated (%d jobs pending)", self._pending)
+                raise PasswordHashingBusy("Password hashing capacity exhausted, try again later")
+            await self._wait_for_slot()  # the slot is handed over still counted in _pending
+        else:
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.executor_kind == "process":
+                # Spans recorded in a worker process never reach this one, so time the round trip here
+                with span(func.__name__):
+                    return await loop.run_in_executor(self._get_executor(), func, *args)
+            # Run in a copy of the caller's context so spans are attributed to the current request
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._get_executor(), context.run, func, *args)
+        finally:
+            self._release()
+
+    async def _wait_for_slot(self):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # handed a slot it will no longer use
+            raise
+
+    def _release(self):
+        """
+        Pass a finished job's slot straight to the oldest waiter, or free it if nobody waits.
+        The slot never becomes free in between, so callers that don't wait can't take it first.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(None)
+                return
+        self._pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_hashing_pool: Optional[PasswordHashingPool] = None
+
+def get_hashing_pool() -> PasswordHashingPool:
+    """Return the process-wide hashing pool; its executor is only started by the first job."""
+    global _hashing_pool
+    if _hashing_pool is None:
+        _hashing_pool = PasswordHashingPool(
+            executor=settings.password_hash_executor,
+            max_workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_max_queue,
+        )
+    return _hashing_pool
+
+def shutdown_hashing_pool():
+    """Shut down the process-wide hashing pool; a new one is created on next use."""
+    global _hashing_pool
+    if _hashing_pool is not None:
+        _hashing_pool.shutdown()
+        _hashing_pool = None
+
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hashes a password on the hashing pool without blocking the event loop.
+
+    Raises:
+        PasswordHashingBusy: If the pool's queue is full.
+        ValueError: If hashing the password fails.
+    """
+    # Resolved here so process pool workers use this process's (possibly overridden) settings
+    rounds = settings.password_hash_rounds if rounds is None else rounds
+    return await get_hashing_pool().run(hash_password, password, rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password on the hashing pool without blocking the event loop.
+
+    Raises:
+        PasswordHashingBusy: If the pool's queue is full.
+        ValueError: If the hashed password format is incorrect or the function fails to verify.
+    """
+    return await get_hashing_pool().run(verify_password, plain_password, hashed_password)
+
+async def hash_passwords_async(passwords: List[str], rounds: Optional[int] = None) -> List[str]:
+    """
+    Hashes many passwords in parallel on the hashing pool, for batch jobs such as bulk imports.
+
+    At most one job per pool worker is in flight, and when requests have filled the pool the
+    batch waits for their jobs to finish instead of being rejected, so a large batch neither
+    floods the queue nor fails halfway.
+    """
+    pool = get_hashing_pool()
+    rounds = settings.password_hash_rounds if rounds is None else rounds
+    semaphore = asyncio.Semaphore(pool.max_workers)
+
+    async def hash_one(password: str) -> str:
+        async with semaphore:
+            return await pool.run(hash_password, password, rounds, wait=True)
+
+    return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+PASSWORD_REQUIREMENTS = "Password must be at least 8 characters long, contain an uppercase letter, a number, and a special character."
+_STRONG_PASSWORD = re.compile(
+    r'^(?=.*[A-Za-z])(?=.*\d)(?=.*[A-Z])(?=.*[!@#$%^&*(),.?":{}|<>])[A-Za-z\d!@#$%^&*(),.?":{}|<>]{8,}$'
+)
+
+def is_strong_password(password: str) -> bool:
+    """Checks a password against PASSWORD_REQUIREMENTS."""
+    return bool(_STRONG_PASSWORD.match(password))
+
 def generate_verification_token():
     return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
@@ -0,0 +1,60 @@
+from builtins import TypeError, ValueError, dict, getattr, isinstance, sorted, str, tuple, type
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+import orjson
+from fastapi.responses import JSONResponse
+from app.schemas.pagination_schema import PaginationLink
+from app.schemas.user_schemas import UserResponse
+
+# Response fields in the order UserResponse declares them, so the JSON matches the schema's output
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson does not encode natively
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, which handles UUIDs, datetimes and enums without a model."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a `fields=` sparse fieldset ("id,nickname,email") into UserResponse field names.
+
+    Fields come back in schema order, so output does not depend on how the client ordered them.
+    Returns None when no fieldset was given.
+
+    :raises ValueError: If a name is not a UserResponse field.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(USER_RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in USER_RESPONSE_FIELDS if field in requested) or None
+
+
+def user_to_dict(user, fields: Sequence[str] = USER_RESPONSE_FIELDS) -> Dict[str, Any]:
+    """
+    Read the UserResponse fields (or the given subset) straight off a User row.
+
+    Values are left as UUIDs, enums and datetimes for orjson to encode natively, so no Pydantic
+    model is built or validated on the way out.
+    """
+    return {field: getattr(user, field) for field in fields}
+
+
+def users_to_dicts(users: Iterable, fields: Sequence[str] = USER_RESPONSE_FIELDS) -> List[Dict[str, Any]]:
+    return [user_to_dict(user, fields) for user in users]
+
+
+def link_to_dict(link: PaginationLink) -> Dict[str, str]:
+    return {"rel": link.rel, "href": str(link.href), "method": link.method}
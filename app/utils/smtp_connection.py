@@ -1,31 +1,56 @@
 # smtp_client.py
 from builtins import Exception, int, str
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from typing import TYPE_CHECKING
 from settings.config import settings
 import logging
 
+# smtplib and the MIME classes are imported on first send, keeping them off the startup path
+if TYPE_CHECKING:
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+
 class SMTPClient:
-    def __init__(self, server: str, port: int, username: str, password: str):
+    def __init__(self, server: str, port: int, username: str, password: str, use_tls: bool = True, timeout: int = 60):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
 
-    def send_email(self, subject: str, html_content: str, recipient: str):
+    def _build_message(self, subject: str, html_content: str, recipient: str) -> "MIMEMultipart":
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.username
+        message['To'] = recipient
+        message.attach(MIMEText(html_content, 'html'))
+        return message
+
+    def connect(self) -> "smtplib.SMTP":
+        """Open an authenticated connection that can be reused for several messages."""
+        import smtplib
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
         try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
+            if self.use_tls:
+                connection.starttls()  # Use TLS
+            connection.login(self.username, self.password)
+        except Exception:
+            connection.close()
+            raise
+        return connection
 
-            with smtplib.SMTP(self.server, self.port) as server:
-                server.starttls()  # Use TLS
-                server.login(self.username, self.password)
-                server.sendmail(self.username, recipient, message.as_string())
-            logging.info(f"Email sent to {recipient}")
+    def send_on(self, connection: "smtplib.SMTP", subject: str, html_content: str, recipient: str):
+        """Send one message over a connection returned by `connect`."""
+        message = self._build_message(subject, html_content, recipient)
+        connection.sendmail(self.username, recipient, message.as_string())
+        logging.info(f"Email sent to {recipient}")
+
+    def send_email(self, subject: str, html_content: str, recipient: str):
+        try:
+            with self.connect() as server:
+                self.send_on(server, subject, html_content, recipient)
         except Exception as e:
             logging.error(f"Failed to send email: {str(e)}")
             raise
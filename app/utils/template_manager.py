@@ -1,46 +1,115 @@
-import markdown2
+import html
+import os
+import re
 from pathlib import Path
+from string import Formatter
+from typing import Dict, List, Tuple
+from app.utils.metrics import timed
+
+# Inline styles applied to each tag for email client compatibility
+EMAIL_STYLES = {
+    'body': 'font-family: Arial, sans-serif; font-size: 16px; color: #333333; background-color: #ffffff; line-height: 1.5;',
+    'h1': 'font-size: 24px; color: #333333; font-weight: bold; margin-top: 20px; margin-bottom: 10px;',
+    'p': 'font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;',
+    'a': 'color: #0056b3; text-decoration: none; font-weight: bold;',
+    'footer': 'font-size: 12px; color: #777777; padding: 20px 0;',
+    'ul': 'list-style-type: none; padding: 0;',
+    'li': 'margin-bottom: 10px;'
+}
+_STYLED_TAG = re.compile('<(' + '|'.join(tag for tag in EMAIL_STYLES if tag != 'body') + ')>')
+# Stands in for a context field while the template goes through markdown; letters and digits only
+# so markdown leaves it untouched.
+_FIELD_TOKEN = 'XEMAILFIELD{}X'
+_FIELD_TOKEN_RE = re.compile('XEMAILFIELD(\\d+)X')
+_formatter = Formatter()
+
+
+class CompiledTemplate:
+    """A fully rendered and styled email with the positions of its context fields."""
+
+    def __init__(self, chunks: List[str], fields: List[Tuple[str, str, str]]):
+        self.chunks = chunks  # literal HTML, one more entry than fields
+        self.fields = fields  # (field_name, format_spec, conversion) as parsed from the template
+
+    def render(self, context: Dict[str, object]) -> str:
+        parts = [self.chunks[0]]
+        for (field, format_spec, conversion), chunk in zip(self.fields, self.chunks[1:]):
+            value, _ = _formatter.get_field(field, (), context)
+            value = _formatter.format_field(_formatter.convert_field(value, conversion), format_spec)
+            parts.append(html.escape(value))
+            parts.append(chunk)
+        return ''.join(parts)
+
 
 class TemplateManager:
+    # Shared by all instances, keyed by path, so a manager built per request still hits the cache
+    _files: Dict[str, Tuple[float, str]] = {}
+    _compiled: Dict[Tuple[str, str], Tuple[Tuple[float, ...], CompiledTemplate]] = {}
+
     def __init__(self):
         # Dynamically determine the root path of the project
         self.root_dir = Path(__file__).resolve().parent.parent.parent  # Adjust this depending on the structure
         self.templates_dir = self.root_dir / 'email_templates'
 
     def _read_template(self, filename: str) -> str:
-        """Private method to read template content."""
+        """Private method to read template content, cached until the file's mtime changes."""
         template_path = self.templates_dir / filename
+        mtime = os.stat(template_path).st_mtime
+        cached = self._files.get(str(template_path))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         with open(template_path, 'r', encoding='utf-8') as file:
-            return file.read()
+            content = file.read()
+        self._files[str(template_path)] = (mtime, content)
+        return content
 
     def _apply_email_styles(self, html: str) -> str:
         """Apply advanced CSS styles inline for email compatibility with excellent typography."""
-        styles = {
-            'body': 'font-family: Arial, sans-serif; font-size: 16px; color: #333333; background-color: #ffffff; line-height: 1.5;',
-            'h1': 'font-size: 24px; color: #333333; font-weight: bold; margin-top: 20px; margin-bottom: 10px;',
-            'p': 'font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;',
-            'a': 'color: #0056b3; text-decoration: none; font-weight: bold;',
-            'footer': 'font-size: 12px; color: #777777; padding: 20px 0;',
-            'ul': 'list-style-type: none; padding: 0;',
-            'li': 'margin-bottom: 10px;'
-        }
-        # Wrap entire HTML content in <div> with body style
-        styled_html = f'<div style="{styles["body"]}">{html}</div>'
-        # Apply styles to each HTML element
-        for tag, style in styles.items():
-            if tag != 'body':  # Skip the body style since it's already applied to the <div>
-                styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
-        return styled_html
+        # Wrap entire HTML content in <div> with body style, then style every known tag in one pass
+        styled_html = f'<div style="{EMAIL_STYLES["body"]}">{html}</div>'
+        return _STYLED_TAG.sub(lambda match: f'<{match.group(1)} style="{EMAIL_STYLES[match.group(1)]}">', styled_html)
 
-    def render_template(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
+    def _compile(self, template_name: str) -> CompiledTemplate:
+        """Render header, template and footer through markdown once, leaving tokens where context fields go."""
         header = self._read_template('header.md')
         footer = self._read_template('footer.md')
-
-        # Read main template and format it with provided context
         main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
 
-        full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        fields = []
+        tokenized = []
+        for literal, field, format_spec, conversion in _formatter.parse(main_template):
+            tokenized.append(literal)
+            if field is not None:
+                tokenized.append(_FIELD_TOKEN.format(len(fields)))
+                fields.append((field, format_spec, conversion))
+
+        full_markdown = f"{header}\n{''.join(tokenized)}\n{footer}"
+        import markdown2  # deferred: only needed the first time each template is compiled
+        styled_html = self._apply_email_styles(markdown2.markdown(full_markdown))
+        pieces = _FIELD_TOKEN_RE.split(styled_html)
+        # split() alternates literal HTML with captured token indexes
+        chunks = pieces[0::2]
+        ordered_fields = [fields[int(index)] for index in pieces[1::2]]
+        return CompiledTemplate(chunks, ordered_fields)
+
+    def _template_mtimes(self, template_name: str) -> Tuple[float, ...]:
+        return tuple(
+            os.stat(self.templates_dir / filename).st_mtime
+            for filename in ('header.md', f'{template_name}.md', 'footer.md')
+        )
+
+    @timed("render_template")
+    def render_template(self, template_name: str, **context) -> str:
+        """
+        Render a markdown template with given context, applying advanced email styles.
+
+        Templates are compiled once and recompiled when any of their files change on disk.
+        Context values are inserted as HTML-escaped text.
+        """
+        key = (str(self.templates_dir), template_name)
+        mtimes = self._template_mtimes(template_name)
+        cached = self._compiled.get(key)
+        if cached is None or cached[0] != mtimes:
+            cached = (mtimes, self._compile(template_name))
+            self._compiled[key] = cached
+        return cached[1].render(context)
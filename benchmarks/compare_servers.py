@@ -0,0 +1,73 @@
+"""
+Load comparison of the development entry point and the production launcher.
+
+    python -m benchmarks.compare_servers [--duration 10] [--concurrency 32] [load options...]
+
+Starts each entry point in turn on a spare port against the configured database, waits until it
+answers, runs the `benchmarks.load` scenarios against it and stops it, then prints req/s and p95
+latency side by side. Unrecognised options are passed on to `benchmarks.load`.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks import load
+
+# The launcher refuses several workers with in-process user caches; per-worker caches are fine for a benchmark
+ENTRY_POINTS = {
+    "uvicorn --reload": [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "{port}", "--reload"],
+    "app.serve": [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", "{port}", "--allow-per-process-backends"],
+}
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/openapi.json", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def benchmark_entry_point(command, port: int, load_argv) -> dict:
+    base_url = f"http://127.0.0.1:{port}"
+    # Its own process group, so the reloader's or arbiter's children are stopped with it
+    process = subprocess.Popen(
+        [part.format(port=port) for part in command], start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url)
+        return asyncio.run(load.run_load(load.parse_args(["--base-url", base_url, *load_argv])))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8100, help="first port to use")
+    args, load_argv = parser.parse_known_args(argv)
+
+    results = {}
+    for offset, (name, command) in enumerate(ENTRY_POINTS.items()):
+        print(f"== {name}")
+        results[name] = benchmark_entry_point(command, args.port + offset, load_argv)
+
+    names = list(results)
+    print(f"\n{'scenario':<12}" + "".join(f"{name + ' req/s':>24}{'p95 ms':>10}" for name in names))
+    for scenario in results[names[0]]:
+        row = "".join(f"{results[name][scenario]['rps']:>24}{results[name][scenario]['p95_ms']:>10}" for name in names)
+        print(f"{scenario:<12}{row}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
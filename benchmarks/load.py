@@ -0,0 +1,178 @@
+"""
+Throughput and latency of the main endpoints under concurrent load.
+
+Start the app against a local Postgres with rate limiting off (e.g. `RATE_LIMIT_ENABLED=false
+uvicorn app.main:app`), then run
+
+    python -m benchmarks.load --base-url http://localhost:8000 --compare benchmarks/baselines/load.json
+
+The users table is seeded first with `--users` verified accounts (all prefixed `load_`, replaced on
+every run) and one admin. Each scenario then runs `--concurrency` clients for `--duration`
+seconds. `--save` writes the results as a new baseline; `--compare` exits with status 1 if a
+scenario's throughput drops, or its p95 latency grows, by more than `--tolerance`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Dict, List
+import httpx
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.utils.security import hash_password
+from settings.config import settings
+
+PASSWORD = "Secure*1234"
+EMAIL_PREFIX = "load_"
+ADMIN_EMAIL = f"{EMAIL_PREFIX}admin@example.com"
+SCENARIOS = ("login", "register", "get_user", "list_users")
+
+
+async def seed(database_url: str, users: int) -> List[str]:
+    """Replace the `load_` users with `users` verified accounts plus an admin; returns the new user ids."""
+    hashed = hash_password(PASSWORD)  # every load user logs in with PASSWORD, so they can share a hash
+    rows = [
+        {
+            "id": uuid.uuid4(), "nickname": f"{EMAIL_PREFIX}{number}", "email": f"{EMAIL_PREFIX}{number}@example.com",
+            "hashed_password": hashed, "role": UserRole.AUTHENTICATED, "email_verified": True, "is_locked": False,
+        }
+        for number in range(users)
+    ]
+    rows.append({
+        "id": uuid.uuid4(), "nickname": f"{EMAIL_PREFIX}admin", "email": ADMIN_EMAIL,
+        "hashed_password": hashed, "role": UserRole.ADMIN, "email_verified": True, "is_locked": False,
+    })
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(delete(User).where(User.email.startswith(EMAIL_PREFIX)))
+            for start in range(0, len(rows), 5000):
+                await conn.execute(insert(User), rows[start:start + 5000])
+    finally:
+        await engine.dispose()
+    return [str(row["id"]) for row in rows[:-1]]
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/login/", data={"username": email, "password": PASSWORD})
+
+
+def make_requests(user_ids: List[str], admin_token: str):
+    """Return one request coroutine factory per scenario."""
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    emails = [f"{EMAIL_PREFIX}{number}@example.com" for number in range(len(user_ids))]
+    return {
+        "login": lambda client: login(client, random.choice(emails)),
+        "register": lambda client: client.post("/register/", json={
+            "email": f"{EMAIL_PREFIX}reg_{uuid.uuid4().hex}@example.com", "password": PASSWORD,
+        }),
+        "get_user": lambda client: client.get(f"/users/{random.choice(user_ids)}", headers=auth),
+        "list_users": lambda client: client.get("/users/", params={"limit": 20}, headers=auth),
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_scenario(client: httpx.AsyncClient, send, concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await send(client)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return a description of every scenario that regressed beyond `tolerance` against `baseline`."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} req/s, baseline {expected['rps']}")
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']}")
+        if result["errors"] > expected["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors, baseline {expected['errors']}")
+    return regressions
+
+
+async def run_load(args) -> Dict[str, dict]:
+    """Seed the database, then run each scenario in turn against `args.base_url`."""
+    user_ids = await seed(args.database_url, args.users)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        response = await login(client, ADMIN_EMAIL)
+        response.raise_for_status()
+        requests = make_requests(user_ids, response.json()["access_token"])
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, requests[name], args.concurrency, args.duration)
+            print(f"{name:<12} {results[name]}")
+    return results
+
+
+async def main(args) -> int:
+    results = await run_load(args)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--users", type=int, default=10000, help="seeded users")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--compare", help="fail on regressions against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
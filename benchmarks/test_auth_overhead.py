@@ -0,0 +1,55 @@
+"""
+Per-request cost of authenticating a protected route.
+
+Run with `pytest benchmarks/test_auth_overhead.py`. The request benchmarks hit the same tiny app
+with and without `require_role`, so the difference between them is the auth overhead.
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from app.dependencies import require_role
+from app.services.jwt_service import create_access_token, decode_token, decode_token_cached, verified_tokens
+
+TOKEN = create_access_token(data={"sub": "admin@example.com", "role": "ADMIN"})
+
+app = FastAPI()
+
+@app.get("/open")
+def open_route():
+    return {}
+
+@app.get("/protected")
+def protected_route(current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+    return {}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_decode_token_uncached(benchmark):
+    benchmark(decode_token, TOKEN)
+
+
+def test_decode_token_cached(benchmark):
+    verified_tokens.clear()
+    benchmark(decode_token_cached, TOKEN)
+    assert verified_tokens.hits > 0
+
+
+def test_require_role_lookup(benchmark):
+    # Declaring the same roles again returns the shared checker rather than a new closure
+    assert require_role(["MANAGER", "ADMIN"]) is require_role(["ADMIN", "MANAGER"])
+    benchmark(require_role, ["ADMIN", "MANAGER"])
+
+
+def test_unprotected_request(benchmark, client):
+    benchmark(client.get, "/open")
+
+
+def test_protected_request(benchmark, client):
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    response = benchmark(client.get, "/protected", headers=headers)
+    assert response.status_code == 200
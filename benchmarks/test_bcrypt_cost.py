@@ -0,0 +1,20 @@
+"""
+Password verification latency per bcrypt cost factor on this machine.
+
+Run with `pytest benchmarks/test_bcrypt_cost.py`. Each step up in cost doubles the work, so pick
+the highest `password_hash_rounds` whose mean stays within the login latency budget, leaving room
+for queueing on the hashing pool under concurrent logins. Existing hashes move to a new cost on
+each user's next successful login.
+"""
+import pytest
+from app.utils.security import hash_password, verify_password
+
+PASSWORD = "Secure*1234"
+COSTS = (10, 11, 12, 13, 14)
+HASHES = {cost: hash_password(PASSWORD, cost) for cost in COSTS}
+
+
+@pytest.mark.parametrize("cost", COSTS)
+def test_verify_password(benchmark, cost):
+    benchmark.extra_info["cost"] = cost
+    assert benchmark.pedantic(verify_password, args=(PASSWORD, HASHES[cost]), rounds=3, iterations=1)
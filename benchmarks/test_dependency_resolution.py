@@ -0,0 +1,53 @@
+"""
+Per-request cost of resolving the settings and email service dependencies.
+
+Run with `pytest benchmarks/test_dependency_resolution.py`. `per_request` reproduces the previous
+providers, which built a new Settings (re-reading .env) and a new EmailService, TemplateManager and
+SMTPClient for every request; `shared` uses the process-wide instances from app.dependencies.
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from app.dependencies import get_email_service, get_settings
+from app.services.email_queue import get_email_queue
+from app.services.email_service import EmailService
+from app.utils.template_manager import TemplateManager
+from settings.config import Settings
+
+
+def per_request_settings() -> Settings:
+    return Settings()
+
+
+def per_request_email_service() -> EmailService:
+    return EmailService(template_manager=TemplateManager(), email_queue=get_email_queue())
+
+
+PROVIDERS = {
+    "per_request": (per_request_settings, per_request_email_service),
+    "shared": (get_settings, get_email_service),
+}
+
+
+def _app(settings_provider, email_service_provider) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def route(settings: Settings = Depends(settings_provider), email_service: EmailService = Depends(email_service_provider)):
+        return {}
+
+    return app
+
+
+@pytest.fixture(scope="module", params=list(PROVIDERS))
+def providers(request):
+    return PROVIDERS[request.param]
+
+
+def test_settings(benchmark, providers):
+    benchmark(providers[0])
+
+
+def test_request(benchmark, providers):
+    with TestClient(_app(*providers)) as client:
+        benchmark(client.get, "/")
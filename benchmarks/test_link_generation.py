@@ -0,0 +1,22 @@
+"""
+Cost of building a user's HATEOAS links.
+
+Run with `pytest benchmarks/test_link_generation.py`. Each link is a route lookup through
+`request.url_for` plus a validated Link.
+"""
+import uuid
+from starlette.requests import Request
+from app.main import app
+from app.utils.link_generation import create_user_links
+
+USER_ID = uuid.uuid4()
+SCOPE = {
+    "type": "http", "app": app, "router": app.router, "scheme": "http", "server": ("testserver", 80),
+    "path": "/users/", "root_path": "", "query_string": b"", "headers": [],
+}
+
+
+def test_create_user_links(benchmark):
+    request = Request(SCOPE)
+    links = benchmark(create_user_links, USER_ID, request)
+    assert [link.rel for link in links] == ["self", "update", "delete"]
@@ -0,0 +1,37 @@
+"""
+Per-request cost of `MetricsMiddleware`.
+
+Run with `pytest benchmarks/test_metrics_overhead.py`. The same tiny app is served with and without
+the middleware, so the difference between the two request benchmarks is the instrumentation overhead.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from app.utils.metrics import MetricsMiddleware, registry, span
+
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with span("work"):
+            return {"id": item_id}
+
+    return app
+
+
+@pytest.fixture(scope="module", params=["plain", "instrumented"])
+def client(request):
+    with TestClient(_app(request.param == "instrumented")) as client:
+        yield client
+
+
+def test_request(benchmark, client):
+    benchmark(client.get, "/items/1")
+
+
+def test_render_metrics(benchmark):
+    benchmark(registry.render)
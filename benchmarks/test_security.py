@@ -0,0 +1,19 @@
+"""
+Cost of bcrypt hashing and verification at the cost factor used for stored passwords.
+
+Run with `pytest benchmarks/test_security.py`. Each round takes a few hundred milliseconds, so
+these use a fixed, small number of rounds.
+"""
+from app.utils.security import hash_password, verify_password
+
+PASSWORD = "Secure*1234"
+HASHED = hash_password(PASSWORD)
+
+
+def test_hash_password(benchmark):
+    hashed = benchmark.pedantic(hash_password, args=(PASSWORD,), rounds=5, iterations=1)
+    assert hashed.startswith("$2b$12$")
+
+
+def test_verify_password(benchmark):
+    assert benchmark.pedantic(verify_password, args=(PASSWORD, HASHED), rounds=5, iterations=1)
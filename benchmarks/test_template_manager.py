@@ -0,0 +1,26 @@
+"""
+Cost of rendering an email template.
+
+Run with `pytest benchmarks/test_template_manager.py`. `cold` drops the compiled template cache
+before each render, which is what every render cost before templates were compiled once.
+"""
+from app.utils.template_manager import TemplateManager
+
+CONTEXT = {"name": "John", "verification_url": "http://localhost/verify-email/1/token", "email": "john@example.com"}
+
+
+def render():
+    return TemplateManager().render_template("email_verification", **CONTEXT)
+
+
+def render_cold():
+    TemplateManager._compiled.clear()
+    return render()
+
+
+def test_render_template(benchmark):
+    assert "John" in benchmark(render)
+
+
+def test_render_template_cold(benchmark):
+    assert benchmark(render_cold) == render()
@@ -0,0 +1,142 @@
+"""
+Query plans and latency of the filtered users listing.
+
+Run with `pytest benchmarks/test_user_filters.py`. It needs a Postgres user allowed to create
+databases: a dedicated `<database>_bench_filters` database is created next to the one in
+DATABASE_URL, seeded with 20,000 users and dropped again, so the configured database is never
+touched. The queries are the ones UserService builds for offset and cursor listing, and the plan
+checks fail if a selective filter stops being served by one of the users indexes.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import uuid
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.database import Base
+from app.models.user_model import User, UserRole
+from app.services.user_service import UserService
+from app.utils.security import hash_password
+from settings.config import settings
+
+SEED_USERS = 20000
+BENCH_DATABASE_SUFFIX = "_bench_filters"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HASHED_PASSWORD = hash_password("Password$123")  # never verified here; hashing 20,000 rows would take hours
+
+SELECTIVE_FILTERS = {
+    "role": {"role": UserRole.ADMIN},
+    "locked": {"is_locked": True},
+    "unverified": {"email_verified": False},
+    "search": {"search": "user_1234"},
+    "created_range": {"created_after": START + timedelta(hours=100), "created_before": START + timedelta(hours=120)},
+}
+LISTINGS = {
+    "offset": lambda session, filters: UserService.list_users(session, 0, 20, filters=filters),
+    "cursor": lambda session, filters: UserService.list_users_by_cursor(session, None, 20, filters=filters),
+}
+
+
+def _seed_rows():
+    for number in range(SEED_USERS):
+        yield {
+            "id": uuid.uuid4(),
+            "nickname": f"user_{number}",
+            "email": f"user_{number}@example.com",
+            "hashed_password": HASHED_PASSWORD,
+            "role": UserRole.ADMIN if number % 1000 == 0 else UserRole.AUTHENTICATED,
+            "is_locked": number % 500 == 0,
+            "email_verified": number % 200 != 0,
+            "created_at": START + timedelta(minutes=number),
+        }
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+async def _run_outside_transaction(url, *statements: str):
+    # CREATE/DROP DATABASE can't run inside a transaction
+    admin = create_async_engine(url, isolation_level="AUTOCOMMIT")
+    try:
+        async with admin.connect() as conn:
+            for statement in statements:
+                await conn.execute(text(statement))
+    finally:
+        await admin.dispose()
+
+
+@pytest.fixture(scope="module")
+def engine(loop):
+    configured = make_url(settings.database_url)
+    name = f"{configured.database}{BENCH_DATABASE_SUFFIX}"
+    engine = create_async_engine(configured.set(database=name))
+
+    async def setup():
+        await _run_outside_transaction(configured, f'DROP DATABASE IF EXISTS "{name}"', f'CREATE DATABASE "{name}"')
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            rows = list(_seed_rows())
+            for start in range(0, len(rows), 5000):
+                await conn.execute(insert(User), rows[start:start + 5000])
+            await conn.execute(text("ANALYZE users"))
+
+    async def teardown():
+        await engine.dispose()
+        await _run_outside_transaction(configured, f'DROP DATABASE IF EXISTS "{name}"')
+
+    loop.run_until_complete(setup())
+    yield engine
+    loop.run_until_complete(teardown())
+
+
+def _listing_query(loop, engine, listing: str, filters):
+    """The statement UserService executes for the first page of `listing` with `filters`."""
+    captured = []
+    execute_query = UserService._execute_query.__func__
+
+    async def capture(cls, session, query, commit=False):
+        captured.append(query)
+        return await execute_query(cls, session, query, commit)
+
+    async def run():
+        async with AsyncSession(engine) as session:
+            await LISTINGS[listing](session, filters)
+
+    UserService._execute_query = classmethod(capture)
+    try:
+        loop.run_until_complete(run())
+    finally:
+        UserService._execute_query = classmethod(execute_query)
+    return captured[0]
+
+
+@pytest.mark.parametrize("listing", LISTINGS)
+@pytest.mark.parametrize("name", SELECTIVE_FILTERS)
+def test_filter_uses_index(loop, engine, name, listing):
+    query = _listing_query(loop, engine, listing, SELECTIVE_FILTERS[name])
+    compiled = query.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+
+    async def explain():
+        async with engine.connect() as conn:
+            result = await conn.execute(text(f"EXPLAIN {compiled}"))
+            return "\n".join(row[0] for row in result)
+
+    plan = loop.run_until_complete(explain())
+    assert "Index" in plan, plan
+    assert "Seq Scan on users" not in plan, plan
+
+
+@pytest.mark.parametrize("listing", LISTINGS)
+@pytest.mark.parametrize("name", SELECTIVE_FILTERS)
+def test_filtered_listing(benchmark, loop, engine, name, listing):
+    async def run():
+        async with AsyncSession(engine) as session:
+            return await LISTINGS[listing](session, SELECTIVE_FILTERS[name])
+
+    page = benchmark(lambda: loop.run_until_complete(run()))
+    assert page[0] if listing == "cursor" else page
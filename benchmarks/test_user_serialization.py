@@ -0,0 +1,68 @@
+"""
+Cost of turning User rows into a response body.
+
+Run with `pytest benchmarks/test_user_serialization.py`. The `pydantic` cases reproduce what the
+routes used to do (validate each row into UserResponse, then let FastAPI validate the response model
+again and encode it); the `orjson` cases are the path the routes use now.
+"""
+import uuid
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.user_model import User, UserRole
+from app.schemas.pagination_schema import PaginationLink
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.link_generation import create_pagination_link
+from app.utils.serialization import ORJSONResponse, link_to_dict, user_to_dict, users_to_dicts
+
+
+def make_user(n: int) -> User:
+    return User(
+        id=uuid.uuid4(), nickname=f"user_{n}", email=f"user{n}@example.com", first_name="John", last_name="Doe",
+        bio="Experienced software developer.", profile_picture_url="https://example.com/profile.jpg",
+        linkedin_profile_url=None, github_profile_url="https://github.com/johndoe",
+        role=UserRole.AUTHENTICATED, is_professional=False,
+    )
+
+USER = make_user(0)
+USERS = [make_user(n) for n in range(100)]
+BASE_URL = "http://testserver/users/"
+
+
+def pydantic_single():
+    model = UserResponse.model_validate(USER)
+    return JSONResponse(jsonable_encoder(UserResponse.model_validate(model.model_dump()))).body
+
+
+def orjson_single():
+    return ORJSONResponse(user_to_dict(USER)).body
+
+
+def pydantic_list():
+    links = [PaginationLink(rel=rel, href=f"{BASE_URL}?skip={skip}&limit=100") for rel, skip in (("self", 0), ("first", 0), ("last", 0))]
+    response = UserListResponse(
+        items=[UserResponse.model_validate(user) for user in USERS], total=100, page=1, size=100, links=links,
+    )
+    return JSONResponse(jsonable_encoder(UserListResponse.model_validate(response.model_dump()))).body
+
+
+def orjson_list():
+    links = [create_pagination_link(rel, BASE_URL, {"skip": skip, "limit": 100}) for rel, skip in (("self", 0), ("first", 0), ("last", 0))]
+    return ORJSONResponse({
+        "items": users_to_dicts(USERS), "total": 100, "total_estimated": False, "page": 1, "size": 100,
+        "links": [link_to_dict(link) for link in links],
+    }).body
+
+
+@pytest.mark.parametrize("serialize", [pydantic_single, orjson_single], ids=["pydantic", "orjson"])
+def test_single_user(benchmark, serialize):
+    benchmark(serialize)
+
+
+@pytest.mark.parametrize("serialize", [pydantic_list, orjson_list], ids=["pydantic", "orjson"])
+def test_list_100_users(benchmark, serialize):
+    benchmark(serialize)
+
+
+def test_paths_agree():
+    assert pydantic_single() == orjson_single()
@@ -1,4 +1,5 @@
 # Standard library imports
+from contextlib import contextmanager
 from datetime import datetime
 from uuid import uuid4
 
@@ -6,6 +7,7 @@ from uuid import uuid4
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, scoped_session
 from faker import Faker
@@ -19,6 +21,10 @@ from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token
+from app.services.rate_limiter import get_rate_limiter
+from app.services.user_cache import get_user_cache
+from app.utils.smtp_connection import SMTPClient
+from tests.smtp_stand_in import LocalSMTPServer
 
 fake = Faker()
 
@@ -30,9 +36,22 @@ AsyncSessionScoped = scoped_session(AsyncTestingSessionLocal)
 
 
 @pytest.fixture
-def email_service():
+def smtp_server():
+    with LocalSMTPServer() as server:
+        yield server
+
+
+@pytest.fixture
+def local_smtp_client(smtp_server):
+    return SMTPClient(smtp_server.host, smtp_server.port, "sender@example.com", "password", use_tls=False, timeout=5)
+
+
+@pytest.fixture
+def email_service(local_smtp_client):
     template_manager = TemplateManager()
     email_service = EmailService(template_manager=template_manager)
+    # Deliver to the in-process SMTP stand-in rather than a real mail provider
+    email_service.smtp_client = local_smtp_client
     return email_service
 
 
@@ -58,12 +77,56 @@ def initialize_database():
 async def setup_database():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # The schema is rebuilt for every test, so cached rows from earlier tests must go too
+    user_cache = get_user_cache()
+    if user_cache:
+        await user_cache.clear()
+    rate_limiter = get_rate_limiter()
+    if rate_limiter:
+        await rate_limiter.clear()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     await engine.dispose()
 
 
+class QueryCounter:
+    """Records the SQL statements and commits issued on the test engine while tracking."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self._tracking = False
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._tracking:
+            self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        if self._tracking:
+            self.commits += 1
+
+    @contextmanager
+    def track(self):
+        self.statements = []
+        self.commits = 0
+        self._tracking = True
+        try:
+            yield self
+        finally:
+            self._tracking = False
+
+
+@pytest.fixture
+def query_counter():
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter._on_execute)
+    event.listen(engine.sync_engine, "commit", counter._on_commit)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter._on_execute)
+    event.remove(engine.sync_engine, "commit", counter._on_commit)
+
+
 @pytest.fixture(scope="function")
 async def db_session(setup_database):
     async with AsyncSessionScoped() as session:
@@ -151,10 +214,10 @@ async def users_with_same_role_50_users(db_session):
     users = []
     for _ in range(50):
         user_data = {
-            "nickname": fake.user_name(),
+            "nickname": fake.unique.user_name(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
-            "email": fake.email(),
+            "email": fake.unique.email(),
             "hashed_password": hash_password("Password$123"),
             "role": UserRole.AUTHENTICATED,
             "email_verified": False,
@@ -0,0 +1,73 @@
+"""
+In-process SMTP server for tests and benchmarks, built on aiosmtpd.
+
+It accepts any AUTH credentials without TLS, records every delivered message and
+the client port it arrived from (so tests can tell how many connections were
+used), and can be told to reject the next N messages with a transient error (or any
+other reply set in `reject_reply`).
+"""
+import socket
+from email import message_from_bytes
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.peers = []
+        self.reject_next = 0
+        self.reject_reply = "451 Temporary failure, try again later"
+        self.rejected = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject_next > 0:
+            self.reject_next -= 1
+            self.rejected += 1
+            return self.reject_reply
+        self.messages.append(message_from_bytes(envelope.content))
+        self.peers.append(session.peer)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalSMTPServer:
+    """Runs a RecordingHandler on 127.0.0.1 in a background thread."""
+
+    def __init__(self):
+        self.handler = RecordingHandler()
+        self.host = "127.0.0.1"
+        self.port = _free_port()
+        self._controller = Controller(
+            self.handler,
+            hostname=self.host,
+            port=self.port,
+            auth_require_tls=False,
+            authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(success=True),
+        )
+
+    @property
+    def messages(self):
+        return self.handler.messages
+
+    @property
+    def connections(self) -> int:
+        return len(set(self.handler.peers))
+
+    def start(self):
+        self._controller.start()
+        return self
+
+    def stop(self):
+        self._controller.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
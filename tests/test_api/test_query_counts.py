@@ -0,0 +1,84 @@
+"""
+Pins the number of SQL statements and commits each endpoint issues, so an extra
+round trip sneaking into a request path shows up as a test failure.
+"""
+from urllib.parse import urlencode
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_get_user_queries(async_client, admin_user, admin_token, query_counter):
+    with query_counter.track():
+        response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert len(query_counter.statements) == 1
+    assert query_counter.commits == 0
+
+
+async def test_list_users_queries(async_client, admin_token, query_counter):
+    with query_counter.track():
+        response = await async_client.get("/users/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert len(query_counter.statements) == 2  # count + page
+    assert query_counter.commits == 0
+
+
+async def test_update_user_queries(async_client, admin_user, admin_token, query_counter):
+    with query_counter.track():
+        response = await async_client.put(f"/users/{admin_user.id}", json={"bio": "Updated"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert len(query_counter.statements) == 1
+    assert query_counter.commits == 1
+
+
+async def test_delete_user_queries(async_client, admin_user, admin_token, query_counter):
+    with query_counter.track():
+        response = await async_client.delete(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 204
+    assert len(query_counter.statements) == 1
+    assert query_counter.commits == 1
+
+
+async def test_create_user_queries(async_client, admin_token, email_service, mocker, query_counter):
+    from app.dependencies import get_email_service
+    from app.main import app
+    mocker.patch.object(email_service, "send_verification_email")
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    user_data = {"email": "counted@example.com", "nickname": "counted_user", "password": "Secure*1234"}
+    with query_counter.track():
+        response = await async_client.post("/users/", json=user_data, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 201
+    user_selects = [s for s in query_counter.statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(user_selects) == 2  # email check + nickname check
+    assert len(query_counter.statements) == 3
+    assert query_counter.commits == 1
+
+
+async def login(async_client, email, password):
+    form_data = urlencode({"username": email, "password": password})
+    return await async_client.post("/login/", data=form_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+
+async def test_login_success_queries(async_client, verified_user, query_counter):
+    with query_counter.track():
+        response = await login(async_client, verified_user.email, "MySuperPassword$1234")
+    assert response.status_code == 200
+    assert len(query_counter.statements) == 2  # lookup + update
+    assert query_counter.commits == 1
+
+
+async def test_login_failure_queries(async_client, verified_user, query_counter):
+    with query_counter.track():
+        response = await login(async_client, verified_user.email, "IncorrectPassword123!")
+    assert response.status_code == 401
+    assert len(query_counter.statements) == 2  # lookup + failed attempt update
+    assert query_counter.commits == 1
+
+
+async def test_login_locked_queries(async_client, locked_user, query_counter):
+    with query_counter.track():
+        response = await login(async_client, locked_user.email, "MySuperPassword$1234")
+    assert response.status_code == 400
+    assert len(query_counter.statements) == 1
+    assert query_counter.commits == 0
@@ -1,11 +1,13 @@
 from builtins import str
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
+from app.dependencies import get_db
 from app.main import app
 from app.models.user_model import User
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
+from settings.config import override_settings
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -71,6 +73,20 @@ async def test_create_user_duplicate_email(async_client, verified_user):
     assert response.status_code == 400
     assert "Email already exists" in response.json().get("detail", "")
 
+@pytest.mark.asyncio
+async def test_create_user_failure_is_not_reported_as_duplicate(db_session, admin_token):
+    # No free nickname is not an email conflict: it reaches the 500 handler
+    app.dependency_overrides[get_db] = lambda: db_session
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            with override_settings(nickname_max_attempts=0):
+                response = await client.post("/users/", json={"email": "taken_nick@example.com", "password": "sS#fdasrongPassword123!"},
+                                             headers={"Authorization": f"Bearer {admin_token}"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 500
+
 @pytest.mark.asyncio
 async def test_create_user_invalid_email(async_client):
     user_data = {
@@ -189,3 +205,139 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_list_users_by_cursor(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/", params={"cursor": "", "limit": 20}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["items"]) == 20
+    assert body["page"] is None
+    next_link = next(link["href"] for link in body["links"] if link["rel"] == "next")
+    response = await async_client.get(next_link, headers=headers)
+    assert response.status_code == 200
+    assert {item["id"] for item in response.json()["items"]}.isdisjoint({item["id"] for item in body["items"]})
+
+@pytest.mark.asyncio
+async def test_list_users_invalid_cursor(async_client, admin_token):
+    response = await async_client.get("/users/", params={"cursor": "garbage"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_window_count(async_client, admin_token, users_with_same_role_50_users):
+    from settings.config import override_settings
+    with override_settings(user_count_strategy="window"):
+        response = await async_client.get("/users/", params={"skip": 10, "limit": 5}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 51  # 50 users plus the admin
+    assert body["total_estimated"] is False
+    assert body["page"] == 3
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type, body", [
+    ("text/csv", "email,nickname,password\nbulk_a@example.com,bulk_a,Secure*1234\nbulk_b@example.com,,Secure*1234\nbroken,,x\n"),
+    ("application/x-ndjson", '{"email": "bulk_a@example.com", "nickname": "bulk_a", "password": "Secure*1234"}\n'
+                             '{"email": "bulk_b@example.com", "password": "Secure*1234"}\n'
+                             'not json\n'),
+])
+async def test_bulk_create_users(async_client, admin_token, email_service, content_type, body):
+    from app.dependencies import get_email_service
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": content_type}
+    response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (2, 0, 1)
+    assert [result["status"] for result in report["results"]] == ["created", "created", "invalid"]
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_reports_malformed_csv_rows(async_client, admin_token, email_service):
+    from app.dependencies import get_email_service
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    body = ('email,nickname,password\n'
+            'bulk_a@example.com,"bulk_a"x,Secure*1234\n'
+            'bulk_b@example.com,bulk_b,"Secure*1234\n'
+            'bulk_c@ex\x00ample.com,bulk_c,Secure*1234\n'
+            'bulk_d@example.com,bulk_d,Secure*1234\n')
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+    response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["invalid", "invalid", "invalid", "created"]
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_requires_admin(async_client, manager_token):
+    headers = {"Authorization": f"Bearer {manager_token}", "Content-Type": "text/csv"}
+    response = await async_client.post("/users/bulk", content="email,password\n", headers=headers)
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_unsupported_type(async_client, admin_token):
+    response = await async_client.post("/users/bulk", json=[], headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 415
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(async_client, admin_token, users_with_same_role_50_users):
+    import json
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 51  # 50 users plus the admin
+    assert "hashed_password" not in rows[0]
+    assert rows[0]["role"] in {"ANONYMOUS", "AUTHENTICATED", "MANAGER", "ADMIN"}
+
+@pytest.mark.asyncio
+async def test_export_users_csv_filtered(async_client, admin_token, admin_user, users_with_same_role_50_users):
+    import csv
+    response = await async_client.get("/users/export", params={"format": "csv", "role": "ADMIN"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert [row["email"] for row in rows] == [admin_user.email]
+
+@pytest.mark.asyncio
+async def test_export_users_requires_admin(async_client, manager_token):
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_update_user_returns_stored_role(async_client, admin_user, admin_token):
+    response = await async_client.put(f"/users/{admin_user.id}", json={"bio": "Updated"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "ADMIN"
+
+@pytest.mark.asyncio
+async def test_get_user_with_fields(async_client, admin_user, admin_token):
+    response = await async_client.get(f"/users/{admin_user.id}", params={"fields": "email,id,nickname"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.json() == {"email": admin_user.email, "nickname": admin_user.nickname, "id": str(admin_user.id)}
+
+@pytest.mark.asyncio
+async def test_get_user_with_unknown_field(async_client, admin_user, admin_token):
+    response = await async_client.get(f"/users/{admin_user.id}", params={"fields": "id,hashed_password"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_with_fields(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/", params={"fields": "id,nickname", "cursor": ""}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert all(set(item) == {"id", "nickname"} for item in body["items"])
+    next_link = next(link["href"] for link in body["links"] if link["rel"] == "next")
+    response = await async_client.get(next_link, headers=headers)
+    assert all(set(item) == {"id", "nickname"} for item in response.json()["items"])
+
+@pytest.mark.asyncio
+async def test_list_users_filtered_by_cursor(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    params = {"cursor": "", "limit": 20, "role": "AUTHENTICATED", "search": users_with_same_role_50_users[0].nickname}
+    response = await async_client.get("/users/", params=params, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert str(users_with_same_role_50_users[0].id) in {item["id"] for item in body["items"]}
+    assert body["total"] == len(body["items"])
+    assert all(item["role"] == "AUTHENTICATED" for item in body["items"])
+    links = {link["rel"]: link["href"] for link in body["links"]}
+    assert "role=AUTHENTICATED" in links["self"] and "search=" in links["self"]
@@ -0,0 +1,41 @@
+import pytest
+from app.database import Database
+from app.dependencies import get_settings
+
+
+@pytest.fixture
+async def fresh_database(monkeypatch):
+    """Swap in an uninitialized Database so the test owns its engine and event loop."""
+    monkeypatch.setattr(Database, "_engine", None)
+    monkeypatch.setattr(Database, "_session_factory", None)
+    yield Database
+    await Database.dispose()
+
+
+async def test_initialize_applies_pool_settings(fresh_database):
+    fresh_database.initialize(get_settings().database_url, pool_size=3, max_overflow=2, pool_recycle=600)
+    pool = fresh_database.get_engine().pool
+    assert pool.size() == 3
+    assert pool._max_overflow == 2
+    assert pool._recycle == 600
+
+
+async def test_initialize_applies_statement_cache_size(fresh_database):
+    fresh_database.initialize(get_settings().database_url, statement_cache_size=0)
+    async with fresh_database.get_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        assert raw.dbapi_connection._prepared_statement_cache is None
+        assert raw.driver_connection._stmt_cache.get_max_size() == 0
+
+
+async def test_warm_up_opens_connections(fresh_database):
+    fresh_database.initialize(get_settings().database_url, pool_size=3)
+    assert await fresh_database.warm_up(10) == 3  # capped at the pool size
+    assert fresh_database.get_engine().pool.checkedin() == 3
+
+
+async def test_dispose_resets_state(fresh_database):
+    fresh_database.initialize(get_settings().database_url)
+    await fresh_database.dispose()
+    with pytest.raises(ValueError):
+        fresh_database.get_session_factory()
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from app.dependencies import get_current_user, get_email_service, get_settings, require_role
+from app.services.jwt_service import create_access_token
+from settings.config import Settings, override_settings
+
+
+def test_require_role_shares_checker_per_role_set():
+    assert require_role(["ADMIN", "MANAGER"]) is require_role(("MANAGER", "ADMIN"))
+    assert require_role("ADMIN") is require_role(["ADMIN"])
+    assert require_role(["ADMIN"]) is not require_role(["ADMIN", "MANAGER"])
+
+
+async def test_require_role_checks_membership():
+    checker = require_role(["ADMIN", "MANAGER"])
+    assert await checker({"user_id": "u", "role": "MANAGER"}) == {"user_id": "u", "role": "MANAGER"}
+    with pytest.raises(HTTPException) as exc_info:
+        await checker({"user_id": "u", "role": "AUTHENTICATED"})
+    assert exc_info.value.status_code == 403
+
+
+async def test_require_single_role_is_not_a_substring_match():
+    with pytest.raises(HTTPException):
+        await require_role("ADMIN")({"user_id": "u", "role": "ADM"})
+
+
+async def test_get_current_user():
+    token = create_access_token(data={"sub": "someone@example.com", "role": "manager"})
+    assert await get_current_user(token) == {"user_id": "someone@example.com", "role": "MANAGER"}
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user("garbage")
+    assert exc_info.value.status_code == 401
+
+
+def test_settings_are_shared_and_frozen():
+    assert get_settings() is get_settings()
+    with pytest.raises(ValidationError):
+        get_settings().max_login_attempts = 10
+
+
+def test_settings_reject_unknown_count_strategy(monkeypatch):
+    monkeypatch.setenv("USER_COUNT_STRATEGY", "estimate")
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_override_settings_restores_values():
+    original = get_settings().max_login_attempts
+    with override_settings(max_login_attempts=original + 1) as settings:
+        assert settings is get_settings()
+        assert get_settings().max_login_attempts == original + 1
+    assert get_settings().max_login_attempts == original
+    with pytest.raises(AttributeError):
+        with override_settings(no_such_setting=1):
+            pass
+
+
+async def test_email_service_is_shared():
+    assert await get_email_service() is await get_email_service()
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from app.services.email_queue import EmailQueue
+from app.services.email_service import EmailService
+from app.utils.template_manager import TemplateManager
+
+
+async def test_queue_delivers_batch_over_one_connection(smtp_server, local_smtp_client):
+    queue = EmailQueue(local_smtp_client, workers=1, batch_size=10)
+    await queue.start()
+    for i in range(5):
+        await queue.enqueue("Subject", f"<p>Message {i}</p>", f"user{i}@example.com")
+    await queue.stop()
+    assert queue.sent == 5
+    assert sorted(message["To"] for message in smtp_server.messages) == [f"user{i}@example.com" for i in range(5)]
+    assert smtp_server.connections == 1
+
+
+async def test_queue_retries_transient_failures(smtp_server, local_smtp_client):
+    smtp_server.handler.reject_next = 2
+    queue = EmailQueue(local_smtp_client, max_retries=3, retry_backoff=0.01)
+    await queue.start()
+    await queue.enqueue("Subject", "<p>Hello</p>", "retry@example.com")
+    await queue.stop()
+    assert queue.sent == 1
+    assert queue.failed == 0
+    assert [message["To"] for message in smtp_server.messages] == ["retry@example.com"]
+
+
+async def test_queue_gives_up_after_max_retries(smtp_server, local_smtp_client):
+    smtp_server.handler.reject_next = 10
+    queue = EmailQueue(local_smtp_client, max_retries=1, retry_backoff=0.01)
+    await queue.start()
+    await queue.enqueue("Subject", "<p>Hello</p>", "bounce@example.com")
+    await queue.stop()
+    assert queue.sent == 0
+    assert queue.failed == 1
+    assert smtp_server.messages == []
+
+
+async def test_queue_does_not_retry_permanent_rejections(smtp_server, local_smtp_client):
+    smtp_server.handler.reject_next = 10
+    smtp_server.handler.reject_reply = "550 Mailbox unavailable"
+    queue = EmailQueue(local_smtp_client, max_retries=3, retry_backoff=0.01)
+    await queue.start()
+    await queue.enqueue("Subject", "<p>Hello</p>", "nobody@example.com")
+    await queue.stop()
+    assert queue.failed == 1
+    assert smtp_server.handler.rejected == 1
+
+
+async def test_queue_counts_sent_across_workers(smtp_server, local_smtp_client):
+    queue = EmailQueue(local_smtp_client, workers=4, batch_size=3)
+    await queue.start()
+    for i in range(40):
+        await queue.enqueue("Subject", f"<p>Message {i}</p>", f"user{i}@example.com")
+    await queue.stop()
+    assert queue.sent == len(smtp_server.messages) == 40
+
+
+async def test_queue_rejects_when_stopped(local_smtp_client):
+    queue = EmailQueue(local_smtp_client)
+    with pytest.raises(RuntimeError):
+        await queue.enqueue("Subject", "<p>Hello</p>", "nobody@example.com")
+
+
+async def test_email_service_enqueues_instead_of_sending(smtp_server, local_smtp_client):
+    queue = EmailQueue(local_smtp_client)
+    await queue.start()
+    email_service = EmailService(template_manager=TemplateManager(), email_queue=queue)
+    email_service.smtp_client = None  # any inline send would fail
+    await email_service.send_user_email({
+        "email": "queued@example.com",
+        "name": "Queued User",
+        "verification_url": "http://example.com/verify?token=abc123"
+    }, 'email_verification')
+    await queue.stop()
+    assert [message["To"] for message in smtp_server.messages] == ["queued@example.com"]
+    assert smtp_server.messages[0]["Subject"] == "Verify Your Account"
@@ -0,0 +1,55 @@
+from datetime import timedelta
+import time
+from app.services import jwt_service
+from app.services.jwt_service import VerifiedTokenCache, create_access_token, decode_token
+
+
+def test_cache_hits_after_first_decode(mocker):
+    cache = VerifiedTokenCache(max_size=8, ttl=300)
+    token = create_access_token(data={"sub": "user@example.com", "role": "admin"})
+    spy = mocker.spy(jwt_service, "decode_token")
+    assert cache.decode(token) == decode_token(token)
+    assert cache.decode(token)["role"] == "ADMIN"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert spy.call_count == 1
+
+
+def test_cache_never_serves_expired_token(mocker):
+    cache = VerifiedTokenCache(max_size=8, ttl=300)
+    token = create_access_token(data={"sub": "user@example.com"}, expires_delta=timedelta(seconds=60))
+    assert cache.decode(token) is not None
+    # Past exp the entry must be dropped and the token re-verified, which rejects it
+    mocker.patch.object(jwt_service.time, "time", return_value=time.time() + 61)
+    mocker.patch.object(jwt_service, "decode_token", return_value=None)
+    assert cache.decode(token) is None
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(cache) == 0
+
+
+def test_cache_ttl_caps_entry_lifetime(mocker):
+    cache = VerifiedTokenCache(max_size=8, ttl=10)
+    token = create_access_token(data={"sub": "user@example.com"}, expires_delta=timedelta(minutes=30))
+    cache.decode(token)
+    mocker.patch.object(jwt_service.time, "time", return_value=time.time() + 11)
+    assert cache.decode(token) is not None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_cache_does_not_store_invalid_tokens():
+    cache = VerifiedTokenCache(max_size=8, ttl=300)
+    assert cache.decode("not-a-token") is None
+    assert cache.decode("not-a-token") is None
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 0)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = VerifiedTokenCache(max_size=2, ttl=300)
+    tokens = [create_access_token(data={"sub": f"user{i}@example.com"}) for i in range(3)]
+    cache.decode(tokens[0])
+    cache.decode(tokens[1])
+    cache.decode(tokens[0])  # refresh tokens[0], leaving tokens[1] least recently used
+    cache.decode(tokens[2])
+    assert len(cache) == 2
+    cache.decode(tokens[0])
+    cache.decode(tokens[1])
+    assert (cache.hits, cache.misses) == (2, 4)
@@ -6,7 +6,7 @@ from uuid import uuid4
 import pytest
 from fastapi import Request
 
-from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links
+from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_cursor_pagination_links, generate_pagination_links
 
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
@@ -49,3 +49,9 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_generate_cursor_pagination_links(mock_request):
+    links = generate_cursor_pagination_links(mock_request, "abc", 5, "def", None)
+    assert [link.rel for link in links] == ["self", "first", "next"]
+    assert normalize_url(str(links[0].href)) == normalize_url("http://testserver/users?cursor=abc&limit=5")
+    assert normalize_url(str(links[2].href)) == normalize_url("http://testserver/users?cursor=def&limit=5")
@@ -0,0 +1,83 @@
+import pytest
+from app.utils import metrics
+from app.utils.metrics import Histogram, RequestTimings, instrument_engine, span, timed
+from app.utils.security import hash_password_async
+from settings.config import override_settings
+from tests.conftest import engine
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+@pytest.fixture
+def request_timings():
+    timings = RequestTimings()
+    token = metrics._current_timings.set(timings)
+    yield timings
+    metrics._current_timings.reset(token)
+
+
+def test_histogram_render():
+    histogram = Histogram("job_seconds", "Job time.", ("job",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5, "a")
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP job_seconds Job time.", "# TYPE job_seconds histogram"]
+    assert 'job_seconds_bucket{job="a",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{job="a",le="1.0"} 2' in lines
+    assert 'job_seconds_bucket{job="a",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{job="a"} 3' in lines
+    assert histogram.get("a") == (3, 5.55)
+
+
+async def test_spans_are_attributed_to_the_current_request(request_timings):
+    @timed("work")
+    async def work():
+        return 1
+
+    await work()
+    with span("work"):
+        pass
+    assert request_timings.spans["work"][0] == 2
+    assert metrics.SPAN_DURATION.get("work")[0] == 2
+
+
+async def test_pooled_hashing_is_attributed_to_the_current_request(request_timings):
+    await hash_password_async("Secure*1234", rounds=4)
+    assert request_timings.spans["hash_password"][0] == 1
+
+
+async def test_queries_recorded_per_request(db_session, request_timings, user):
+    from app.services.user_service import UserService
+    instrument_engine(engine)
+    await UserService.list_users(db_session)
+    assert request_timings.spans["db"][0] >= 1
+
+
+async def test_request_metrics_and_server_timing(async_client, admin_user, admin_token):
+    instrument_engine(engine)
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert "db;dur=" in response.headers["server-timing"]
+
+    response = await async_client.get("/metrics", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/users/{user_id}",status="200"} 1' in response.text
+    assert 'http_request_db_queries_count{method="GET",route="/users/{user_id}"} 1' in response.text
+    assert "server-timing" not in response.headers
+
+
+async def test_metrics_require_admin_or_scrape_token(async_client, user_token):
+    assert (await async_client.get("/metrics")).status_code == 401
+    assert (await async_client.get("/metrics", headers={"Authorization": f"Bearer {user_token}"})).status_code == 403
+    assert (await async_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})).status_code == 401
+    with override_settings(metrics_token="scrape-secret"):
+        response = await async_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
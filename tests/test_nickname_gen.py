@@ -0,0 +1,23 @@
+from app.schemas.user_schemas import validate_nickname
+from app.utils.nickname_gen import ADJECTIVES, ANIMALS, generate_nickname, generate_nickname_candidates
+
+
+def test_generate_nickname_is_valid():
+    for _ in range(200):
+        nickname = generate_nickname()
+        assert validate_nickname(nickname) == nickname
+
+
+def test_longest_nickname_fits_limit():
+    longest = f"{max(ADJECTIVES, key=len)}_{max(ANIMALS, key=len)}_9999"
+    assert validate_nickname(longest) == longest
+
+
+def test_keyspace_size():
+    assert len(set(ADJECTIVES)) * len(set(ANIMALS)) * 10000 > 25_000_000
+
+
+def test_generate_nickname_candidates_are_distinct():
+    candidates = generate_nickname_candidates(20)
+    assert len(candidates) == 20
+    assert len(set(candidates)) == 20
@@ -0,0 +1,17 @@
+import pytest
+from fakeredis import aioredis as fake_aioredis
+from app.utils.redis_client import delete_prefixed, redis_from_url
+
+
+async def test_delete_prefixed_leaves_other_keys():
+    client = fake_aioredis.FakeRedis()
+    for number in range(7):
+        await client.set(f"users:{number}", "x")
+    await client.set("ratelimit:login:ip:1", "1")
+    assert await delete_prefixed(client, "users:", batch_size=3) == 7
+    assert await client.keys() == [b"ratelimit:login:ip:1"]
+
+
+def test_redis_from_url():
+    client = redis_from_url("redis://localhost:6379/3")
+    assert client.connection_pool.connection_kwargs["db"] == 3
@@ -1,7 +1,12 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
+import asyncio
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import (
+    PasswordHashingBusy, PasswordHashingPool, hash_cost, hash_password, hash_password_async, needs_rehash,
+    verify_password, verify_password_async
+)
+from settings.config import override_settings
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +70,97 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+async def test_hash_password_async_round_trip():
+    """Test that the pooled helpers produce hashes the sync helpers accept."""
+    hashed = await hash_password_async("secure_password", rounds=4)
+    assert hashed.startswith('$2b$04$')
+    assert verify_password("secure_password", hashed) is True
+    assert await verify_password_async("secure_password", hashed) is True
+    assert await verify_password_async("incorrect_password", hashed) is False
+
+async def test_verify_password_async_invalid_hash():
+    """Test that errors raised on the worker propagate to the caller."""
+    with pytest.raises(ValueError):
+        await verify_password_async("secure_password", "invalid_hash_format")
+
+async def test_hashing_pool_rejects_when_saturated():
+    """Test that jobs beyond workers + queue are rejected instead of queued."""
+    pool = PasswordHashingPool(executor="thread", max_workers=1, max_queue=1)
+    try:
+        jobs = [asyncio.ensure_future(pool.run(hash_password, "secure_password", 8)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.pending == 2
+        with pytest.raises(PasswordHashingBusy):
+            await pool.run(hash_password, "secure_password", 4)
+        hashes = await asyncio.gather(*jobs)
+        assert all(h.startswith('$2b$08$') for h in hashes)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+async def test_hashing_pool_waits_for_a_slot_when_asked():
+    """Test that a waiting job starts as soon as a running one finishes, without polling."""
+    pool = PasswordHashingPool(executor="thread", max_workers=1, max_queue=0)
+    try:
+        running = asyncio.ensure_future(pool.run(hash_password, "secure_password", 8))
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(pool.run(hash_password, "secure_password", 4, wait=True))
+        await asyncio.sleep(0)
+        assert pool.pending == 1 and not waiting.done()
+        await running
+        assert (await waiting).startswith('$2b$04$')
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+async def test_hashing_pool_hands_freed_slot_to_waiter():
+    """Test that a caller arriving as a slot frees up can't take it from a waiting job."""
+    pool = PasswordHashingPool(executor="thread", max_workers=1, max_queue=0)
+    try:
+        finished = []
+
+        async def hash_and_record(number):
+            await pool.run(hash_password, "secure_password", 4, wait=True)
+            finished.append(number)
+
+        running = asyncio.ensure_future(pool.run(hash_password, "secure_password", 6))
+        await asyncio.sleep(0)
+        waiting = [asyncio.ensure_future(hash_and_record(number)) for number in range(3)]
+        await asyncio.sleep(0)
+        await running
+        # The slot went to the first waiter, which hasn't resumed yet
+        with pytest.raises(PasswordHashingBusy):
+            await pool.run(hash_password, "secure_password", 4)
+        await asyncio.gather(*waiting)
+        assert finished == [0, 1, 2]
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+async def test_hashing_pool_cancelled_waiter_passes_slot_on():
+    pool = PasswordHashingPool(executor="thread", max_workers=1, max_queue=0)
+    try:
+        running = asyncio.ensure_future(pool.run(hash_password, "secure_password", 6))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(pool.run(hash_password, "secure_password", 4, wait=True))
+        waiting = asyncio.ensure_future(pool.run(hash_password, "secure_password", 4, wait=True))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await running
+        assert (await waiting).startswith('$2b$04$')
+        assert cancelled.cancelled()
+    finally:
+        pool.shutdown()
+
+def test_hash_password_uses_configured_cost():
+    with override_settings(password_hash_rounds=5):
+        assert hash_cost(hash_password("secure_password")) == 5
+
+def test_needs_rehash():
+    hashed = hash_password("secure_password", 4)
+    assert hash_cost(hashed) == 4
+    assert needs_rehash(hashed, 5)
+    assert not needs_rehash(hashed, 4)
+    with override_settings(password_hash_rounds=4):
+        assert not needs_rehash(hashed)
+    assert hash_cost("not-a-hash") is None and needs_rehash("not-a-hash", 4)
@@ -0,0 +1,40 @@
+import uuid
+import pytest
+from app.models.user_model import User, UserRole
+from app.schemas.pagination_schema import PaginationLink
+from app.schemas.user_schemas import UserResponse
+from app.utils.serialization import ORJSONResponse, link_to_dict, parse_fields, user_to_dict
+
+
+def make_user(**overrides):
+    values = dict(
+        id=uuid.uuid4(), nickname="john_doe", email="john.doe@example.com", first_name="John", last_name="Doe",
+        bio="Developer", profile_picture_url=None, linkedin_profile_url="https://linkedin.com/in/johndoe",
+        github_profile_url=None, role=UserRole.MANAGER, is_professional=True, hashed_password="secret",
+    )
+    values.update(overrides)
+    return User(**values)
+
+
+def test_user_json_matches_response_model():
+    user = make_user()
+    expected = UserResponse.model_validate(user).model_dump_json().encode()
+    assert ORJSONResponse(user_to_dict(user)).body == expected
+
+
+def test_user_json_omits_private_fields():
+    body = user_to_dict(make_user())
+    assert "hashed_password" not in body
+    assert set(body) == set(UserResponse.model_fields)
+
+
+def test_link_json_matches_pagination_link():
+    link = PaginationLink(rel="next", href="http://testserver/users/?skip=10&limit=10")
+    assert ORJSONResponse(link_to_dict(link)).body == link.model_dump_json().encode()
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(" email , id,nickname") == ("email", "nickname", "id")
+    with pytest.raises(ValueError):
+        parse_fields("id,hashed_password")
@@ -0,0 +1,56 @@
+import pytest
+from app import serve
+from settings.config import override_settings
+
+
+@pytest.fixture
+def cpus(monkeypatch):
+    def set_cpus(affinity, quota=None):
+        monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: set(range(affinity)))
+        monkeypatch.setattr(serve, "_cgroup_cpu_quota", lambda: quota)
+    monkeypatch.delenv("PASSWORD_HASH_WORKERS", raising=False)
+    return set_cpus
+
+
+def test_cpu_limit_uses_quota(cpus):
+    cpus(8, quota=2.5)
+    assert serve.cpu_limit() == 3
+    cpus(2, quota=16)
+    assert serve.cpu_limit() == 2
+    cpus(4)
+    assert serve.cpu_limit() == 4
+
+
+def test_plan_splits_hashing_threads_between_workers(cpus):
+    cpus(4)
+    launch = serve.plan(server="uvicorn")
+    assert launch["workers"] == 4
+    assert launch["settings"] == {"password_hash_workers": 1}
+    assert serve.plan(workers=2, server="uvicorn")["settings"] == {"password_hash_workers": 2}
+
+
+def test_plan_keeps_explicit_hashing_workers(cpus, monkeypatch):
+    cpus(4)
+    monkeypatch.setenv("PASSWORD_HASH_WORKERS", "3")
+    assert serve.plan(server="gunicorn")["settings"] == {}
+
+
+def test_plan_flags_per_process_backends_with_several_workers(cpus):
+    cpus(4)
+    with override_settings(rate_limit_enabled=True, rate_limit_backend="memory", user_cache_backend="memory"):
+        assert serve.plan(workers=1, server="uvicorn")["per_process_backends"] == []
+        assert serve.plan(workers=2, server="uvicorn")["per_process_backends"] == ["rate_limit_backend", "user_cache_backend"]
+    with override_settings(rate_limit_backend="redis", user_cache_backend="none"):
+        assert serve.plan(workers=2, server="uvicorn")["per_process_backends"] == []
+
+
+def test_main_refuses_several_workers_with_memory_backends(cpus, monkeypatch):
+    cpus(4)
+    started = []
+    monkeypatch.setattr(serve.os, "environ", dict(serve.os.environ))  # main exports the hashing pool size
+    monkeypatch.setattr(serve, "run_uvicorn", lambda *args: started.append(args))
+    with override_settings(rate_limit_enabled=True, rate_limit_backend="memory"):
+        assert serve.main(["--workers", "2", "--server", "uvicorn"]) == 2
+        assert started == []
+        assert serve.main(["--workers", "2", "--server", "uvicorn", "--allow-per-process-backends"]) == 0
+    assert len(started) == 1
@@ -0,0 +1,80 @@
+import pytest
+from fakeredis import aioredis as fake_aioredis
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import InProcessRateLimiter, RateLimiter, RedisRateLimiter, _sliding_window, client_ip
+from app.utils import security
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def limiter(request, monkeypatch):
+    if request.param == "redis":
+        backend = RedisRateLimiter(fake_aioredis.FakeRedis())
+    else:
+        backend = InProcessRateLimiter()
+    limiter = RateLimiter(backend, window=60, limits={"login": (5, 2), "register": (3, 0)})
+    monkeypatch.setattr(rate_limiter_module, "_rate_limiter", limiter)
+    yield limiter
+    await limiter.clear()
+
+
+async def test_limits_per_email_and_ip(limiter):
+    assert (await limiter.check("login", "10.0.0.1", "a@example.com")).allowed
+    assert (await limiter.check("login", "10.0.0.1", "a@example.com")).allowed
+    rejected = await limiter.check("login", "10.0.0.1", "a@example.com")
+    assert not rejected.allowed and 1 <= rejected.retry_after <= 60
+    # Other accounts from the same address are limited by the per-IP budget only
+    assert (await limiter.check("login", "10.0.0.1", "b@example.com")).allowed
+    assert (await limiter.check("login", "10.0.0.1", "c@example.com")).allowed
+    assert not (await limiter.check("login", "10.0.0.1", "d@example.com")).allowed
+    assert (await limiter.check("login", "10.0.0.2", "d@example.com")).allowed
+    assert limiter.rejected == 2
+
+
+async def test_scopes_are_counted_separately(limiter):
+    for _ in range(3):
+        assert (await limiter.check("register", "10.0.0.1", "a@example.com")).allowed
+    assert not (await limiter.check("register", "10.0.0.1", "a@example.com")).allowed
+    assert (await limiter.check("login", "10.0.0.1", "a@example.com")).allowed
+
+
+def test_sliding_window_weights_previous_window():
+    # Half way through the window, half of the previous window's 10 attempts still count
+    assert _sliding_window(10, 5, 10, 60, 30.0).allowed
+    result = _sliding_window(10, 6, 10, 60, 30.0)
+    assert not result.allowed and result.retry_after == 6
+
+
+def test_client_ip_reads_forwarded_for_from_the_right():
+    assert client_ip("6.6.6.6, 203.0.113.7", "172.18.0.5", 1) == "203.0.113.7"
+    assert client_ip("203.0.113.7, 10.0.0.2", "172.18.0.5", 2) == "203.0.113.7"
+    assert client_ip("6.6.6.6", "172.18.0.5", 0) == "172.18.0.5"
+    assert client_ip(None, "172.18.0.5", 1) == "172.18.0.5"
+
+
+async def test_rejected_login_does_no_database_or_bcrypt_work(async_client, verified_user, limiter, query_counter, mocker):
+    verify = mocker.spy(security, "verify_password")
+    form = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    for _ in range(2):
+        assert (await async_client.post("/login/", data=form)).status_code == 200
+    with query_counter.track():
+        response = await async_client.post("/login/", data=form)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+    assert query_counter.statements == []
+    assert verify.call_count == 2
+
+
+async def test_register_limited_per_forwarded_client(async_client, limiter, email_service):
+    from app.dependencies import get_email_service
+    from app.main import app
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    for n in range(3):
+        headers = {"X-Forwarded-For": f"6.6.6.{n}, 203.0.113.7"}
+        response = await async_client.post("/register/", json={"email": f"new{n}@example.com", "password": "Secure*1234"}, headers=headers)
+        assert response.status_code != 429
+    response = await async_client.post("/register/", json={"email": "new9@example.com", "password": "Secure*1234"}, headers={"X-Forwarded-For": "203.0.113.7"})
+    assert response.status_code == 429
+    response = await async_client.post("/register/", json={"email": "new9@example.com", "password": "Secure*1234"}, headers={"X-Forwarded-For": "203.0.113.8"})
+    assert response.status_code != 429
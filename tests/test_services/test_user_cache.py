@@ -0,0 +1,80 @@
+import pytest
+from fakeredis import aioredis as fake_aioredis
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import InProcessUserCache, RedisUserCache, UserCache
+from app.services.user_service import UserService
+from tests.conftest import AsyncTestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def user_cache(request, monkeypatch):
+    if request.param == "redis":
+        backend = RedisUserCache(fake_aioredis.FakeRedis())
+    else:
+        backend = InProcessUserCache(max_size=100)
+    cache = UserCache(backend, ttl=60)
+    monkeypatch.setattr(user_cache_module, "_user_cache", cache)
+    yield cache
+    await cache.clear()
+
+
+async def test_get_by_id_is_served_from_cache(db_session, user, user_cache, query_counter):
+    await UserService.get_by_id(db_session, user.id)
+    async with AsyncTestingSessionLocal() as session:
+        with query_counter.track():
+            cached = await UserService.get_by_id(session, user.id)
+            by_email = await UserService.get_by_email(session, user.email)
+    assert query_counter.statements == []
+    assert cached.id == user.id and cached.email == user.email and cached.role == user.role
+    assert cached.created_at == user.created_at
+    assert by_email is cached
+    assert user_cache.hits == 2
+
+
+async def test_cache_never_stores_password_hash(db_session, user, user_cache):
+    await UserService.get_by_id(db_session, user.id)
+    stored = await user_cache.backend.get(f"id:{user.id}")
+    assert "hashed_password" not in stored
+    assert stored["email"] == user.email
+
+
+async def test_update_invalidates_both_keys(db_session, user, user_cache):
+    old_email = user.email
+    await UserService.get_by_email(db_session, old_email)
+    await UserService.update(db_session, user.id, {"email": "changed@example.com"})
+    async with AsyncTestingSessionLocal() as session:
+        assert await UserService.get_by_email(session, old_email) is None
+        refreshed = await UserService.get_by_id(session, user.id)
+    assert refreshed.email == "changed@example.com"
+
+
+async def test_delete_invalidates(db_session, user, user_cache):
+    await UserService.get_by_id(db_session, user.id)
+    await UserService.delete(db_session, user.id)
+    async with AsyncTestingSessionLocal() as session:
+        assert await UserService.get_by_id(session, user.id) is None
+
+
+async def test_failed_login_refreshes_cached_state(db_session, verified_user, user_cache):
+    await UserService.get_by_id(db_session, verified_user.id)
+    await UserService.login_user(db_session, verified_user.email, "wrongpassword")
+    async with AsyncTestingSessionLocal() as session:
+        cached = await UserService.get_by_id(session, verified_user.id)
+    assert cached.failed_login_attempts == 1
+
+
+async def test_unlock_invalidates(db_session, locked_user, user_cache):
+    await UserService.get_by_id(db_session, locked_user.id)
+    assert await UserService.unlock_user_account(db_session, locked_user.id)
+    async with AsyncTestingSessionLocal() as session:
+        assert (await UserService.get_by_id(session, locked_user.id)).is_locked is False
+
+
+async def test_lru_evicts_oldest():
+    backend = InProcessUserCache(max_size=2)
+    for key in ("a", "b", "c"):
+        await backend.set(key, key, ttl=60)
+    assert await backend.get("a") is None
+    assert await backend.get("c") == "c"
@@ -1,9 +1,13 @@
 from builtins import range
+import asyncio
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
 from app.dependencies import get_settings
 from app.models.user_model import User
-from app.services.user_service import UserService
+from app.services.user_service import UserCreationError, UserService
+from settings.config import override_settings
+from tests.conftest import AsyncTestingSessionLocal
 
 pytestmark = pytest.mark.asyncio
 
@@ -28,6 +32,11 @@ async def test_create_user_with_invalid_data(db_session, email_service):
     user = await UserService.create(db_session, user_data, email_service)
     assert user is None
 
+async def test_create_user_without_free_nickname_raises(db_session, email_service):
+    user_data = {"email": "no_nickname@example.com", "password": "ValidPassword123!"}
+    with override_settings(nickname_max_attempts=0), pytest.raises(UserCreationError):
+        await UserService.create(db_session, user_data, email_service)
+
 # Test fetching a user by ID when the user exists
 async def test_get_by_id_user_exists(db_session, user):
     retrieved_user = await UserService.get_by_id(db_session, user.id)
@@ -157,4 +166,196 @@ async def test_unlock_user_account(db_session, locked_user):
     unlocked = await UserService.unlock_user_account(db_session, locked_user.id)
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
-    assert not refreshed_user.is_locked, "The user should no longer be locked"
\ No newline at end of file
+    assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Test walking every page with keyset pagination
+async def test_list_users_by_cursor_covers_all_users(db_session, users_with_same_role_50_users):
+    seen = []
+    users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db_session, None, 15)
+    assert prev_cursor is None
+    seen.extend(users)
+    while next_cursor:
+        users, next_cursor, prev_cursor = await UserService.list_users_by_cursor(db_session, next_cursor, 15)
+        assert prev_cursor is not None
+        seen.extend(users)
+    assert len(seen) == 50
+    assert len({user.id for user in seen}) == 50
+
+# Test that a prev cursor returns the preceding page in ascending order
+async def test_list_users_by_cursor_prev_page(db_session, users_with_same_role_50_users):
+    first_page, next_cursor, _ = await UserService.list_users_by_cursor(db_session, None, 10)
+    second_page, _, prev_cursor = await UserService.list_users_by_cursor(db_session, next_cursor, 10)
+    back_page, _, back_prev = await UserService.list_users_by_cursor(db_session, prev_cursor, 10)
+    assert [user.id for user in back_page] == [user.id for user in first_page]
+    assert back_prev is None
+    assert first_page[-1].id != second_page[0].id
+
+# Test that a malformed cursor is rejected
+async def test_list_users_by_cursor_invalid(db_session):
+    with pytest.raises(ValueError):
+        await UserService.list_users_by_cursor(db_session, "not-a-cursor", 10)
+
+# Test that the windowed page fetch returns the total alongside the page
+async def test_list_users_with_total(db_session, users_with_same_role_50_users):
+    users, total = await UserService.list_users_with_total(db_session, skip=40, limit=20)
+    assert len(users) == 10
+    assert total == 50
+    users, total = await UserService.list_users_with_total(db_session, skip=100, limit=20)
+    assert users == [] and total is None
+
+# Test that the cached count is reused until it expires
+async def test_count_cached(db_session, users_with_same_role_50_users):
+    UserService._count_cache = None
+    assert await UserService.count_cached(db_session, ttl=60) == (50, False)
+    db_session.add(User(nickname="late_user", email="late_user@example.com", hashed_password="x"))
+    await db_session.commit()
+    assert await UserService.count_cached(db_session, ttl=60) == (50, True)
+    UserService._count_cache = (0.0, 50)  # simulate expiry
+    assert await UserService.count_cached(db_session, ttl=60) == (51, False)
+    UserService._count_cache = None
+
+# Test the planner-statistics estimate and its exact fallback
+async def test_count_with_strategy_estimated(db_session, users_with_same_role_50_users):
+    assert await UserService.count_with_strategy(db_session, "exact") == (50, False)
+    await db_session.execute(text("ANALYZE users"))
+    assert await UserService.count_with_strategy(db_session, "estimated") == (50, True)
+
+# Test that concurrent failed logins are all counted
+async def test_failed_logins_counted_atomically(db_session, verified_user):
+    async def attempt():
+        async with AsyncTestingSessionLocal() as session:
+            assert await UserService.login_user(session, verified_user.email, "wrongpassword") is None
+
+    with override_settings(max_login_attempts=100):
+        await asyncio.gather(*(attempt() for _ in range(5)))
+    result = await db_session.execute(select(User.failed_login_attempts, User.is_locked).where(User.id == verified_user.id))
+    assert tuple(result.one()) == (5, False)
+
+# Test that a successful login resets the failure counter in place
+async def test_login_user_resets_failed_attempts(db_session, verified_user):
+    await UserService.login_user(db_session, verified_user.email, "wrongpassword")
+    assert verified_user.failed_login_attempts == 1
+    logged_in_user = await UserService.login_user(db_session, verified_user.email, "MySuperPassword$1234")
+    assert logged_in_user is verified_user
+    assert logged_in_user.failed_login_attempts == 0
+    assert logged_in_user.last_login_at is not None
+
+# Test that a taken nickname is replaced instead of looping forever
+async def test_create_user_with_taken_nickname(db_session, email_service, user):
+    user_data = {
+        "email": "nickname_clash@example.com",
+        "password": "ValidPassword123!",
+        "nickname": user.nickname,
+    }
+    new_user = await UserService.create(db_session, user_data, email_service)
+    assert new_user is not None
+    assert new_user.nickname != user.nickname
+
+# Test that a nickname claimed after the availability check is retried via ON CONFLICT
+async def test_create_user_nickname_conflict_retry(db_session, email_service, user, mocker):
+    mocker.patch.object(UserService, "_execute_query", return_value=None)  # availability check sees nothing taken
+    user_data = {
+        "email": "nickname_race@example.com",
+        "password": "ValidPassword123!",
+        "nickname": user.nickname,
+    }
+    new_user = await UserService.create(db_session, user_data, email_service)
+    assert new_user is not None
+    assert new_user.nickname != user.nickname
+
+async def _records(rows):
+    for number, record in enumerate(rows, start=1):
+        yield number, record
+
+# Test that a bulk import creates valid rows and reports duplicates and invalid rows without failing the batch
+async def test_bulk_create(db_session, email_service, user):
+    rows = [
+        {"email": "bulk1@example.com", "password": "ValidPassword123!", "nickname": "bulk_one"},
+        {"email": user.email, "password": "ValidPassword123!"},
+        {"email": "not-an-email", "password": "ValidPassword123!"},
+        {"email": "bulk2@example.com", "password": "weak"},
+        {"email": "bulk3@example.com", "password": "ValidPassword123!", "nickname": user.nickname},
+        {"email": "bulk1@example.com", "password": "ValidPassword123!"},
+        ValueError("Could not parse row"),
+    ]
+    report = await UserService.bulk_create(db_session, _records(rows), email_service, batch_size=4)
+    assert [entry["status"] for entry in report] == ["created", "duplicate", "invalid", "invalid", "created", "duplicate", "invalid"]
+    assert [entry["row"] for entry in report] == list(range(1, 8))
+    renamed = await UserService.get_by_email(db_session, "bulk3@example.com")
+    assert renamed is not None and renamed.nickname != user.nickname
+    assert await UserService.count(db_session) == 3
+
+# Test that streaming users yields plain rows in batches of the requested size
+async def test_stream_users(db_session, users_with_same_role_50_users):
+    batches = [rows async for rows in UserService.stream_users(db_session, ["id", "email"], batch_size=20)]
+    assert [len(rows) for rows in batches] == [20, 20, 10]
+    assert tuple(batches[0][0]._fields) == ("id", "email")
+
+# Test that stream_users applies equality filters and ignores unset ones
+async def test_stream_users_filtered(db_session, locked_user, verified_user):
+    batches = [rows async for rows in UserService.stream_users(db_session, ["email"], filters={"is_locked": True, "role": None})]
+    assert [row.email for rows in batches for row in rows] == [locked_user.email]
+
+# Test that a fieldset loads only the requested columns
+async def test_get_by_id_with_fields(user, query_counter):
+    async with AsyncTestingSessionLocal() as session:
+        with query_counter.track():
+            partial = await UserService.get_by_id(session, user.id, ["nickname", "email"])
+        assert (partial.id, partial.nickname, partial.email) == (user.id, user.nickname, user.email)
+        assert "hashed_password" not in query_counter.statements[0]
+        assert "bio" not in query_counter.statements[0]
+        with pytest.raises(InvalidRequestError):
+            partial.bio
+
+# Test that cursor pages keep the columns needed for their cursors when a fieldset is given
+async def test_list_users_by_cursor_with_fields(users_with_same_role_50_users):
+    async with AsyncTestingSessionLocal() as session:
+        users, next_cursor, _ = await UserService.list_users_by_cursor(session, None, 10, ["email"])
+        assert len(users) == 10 and next_cursor is not None
+        next_page, _, _ = await UserService.list_users_by_cursor(session, next_cursor, 10, ["email"])
+        assert {u.id for u in users}.isdisjoint(u.id for u in next_page)
+
+# Test that listing filters combine and that the count follows them
+async def test_list_users_filtered(db_session, locked_user, verified_user, unverified_user):
+    users = await UserService.list_users(db_session, filters={"is_locked": False, "email_verified": False})
+    assert [u.id for u in users] == [unverified_user.id]
+    assert await UserService.count(db_session, {"is_locked": True}) == 1
+    assert await UserService.count_with_strategy(db_session, "estimated", {"email_verified": True}) == (1, False)
+
+# Test that search matches nickname or email prefixes and treats LIKE wildcards literally
+async def test_list_users_search(db_session, user, verified_user):
+    user.nickname = "abc_def"
+    verified_user.nickname = "abcxdef"
+    await db_session.commit()
+    found = await UserService.list_users(db_session, filters={"search": "abc_"})
+    assert [u.id for u in found] == [user.id]
+    found = await UserService.list_users(db_session, filters={"search": verified_user.email[:5]})
+    assert verified_user.id in {u.id for u in found}
+    assert await UserService.list_users(db_session, filters={"search": "%"}) == []
+
+@pytest.fixture
+def background_sessions(monkeypatch):
+    # Background work opens sessions through Database; use the per-test engine instead, since the
+    # application engine's pooled connections belong to an earlier test's event loop
+    from app.database import Database
+    monkeypatch.setattr(Database, "_session_factory", AsyncTestingSessionLocal)
+
+# Test that logging in with an outdated bcrypt cost upgrades the stored hash in the background
+async def test_login_rehashes_outdated_password(db_session, verified_user, background_sessions):
+    from app.utils.security import hash_cost, hash_password, verify_password
+    verified_user.hashed_password = hash_password("MySuperPassword$1234", 4)
+    await db_session.commit()
+    with override_settings(password_hash_rounds=5):
+        assert await UserService.login_user(db_session, verified_user.email, "MySuperPassword$1234")
+        await asyncio.gather(*UserService._rehash_tasks)
+    async with AsyncTestingSessionLocal() as session:
+        stored = (await session.execute(select(User.hashed_password).where(User.id == verified_user.id))).scalar_one()
+    assert hash_cost(stored) == 5
+    assert verify_password("MySuperPassword$1234", stored)
+
+# Test that a background rehash never overwrites a password changed in the meantime
+async def test_rehash_skips_changed_password(db_session, verified_user, background_sessions):
+    original = verified_user.hashed_password
+    assert not await UserService._rehash_password(verified_user.id, "MySuperPassword$1234", "$2b$04$stale")
+    await db_session.refresh(verified_user)
+    assert verified_user.hashed_password == original
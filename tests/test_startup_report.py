@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from app.startup_report import main, parse_importtime, summarize
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:        50 |        150 | io
+import time:        20 |         20 |     pkg.leaf
+import time:        30 |         50 |   pkg.sub
+import time:        10 |         10 |   json
+import time:       400 |        460 | pkg
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(SAMPLE)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings][:3] == [
+        ("_io", 100, 100, 1), ("io", 50, 150, 0), ("pkg.leaf", 20, 20, 2),
+    ]
+
+
+def test_summarize():
+    summary = summarize(parse_importtime(SAMPLE), "pkg", top=2)
+    assert summary["total_ms"] == 0.5
+    assert summary["direct_imports"] == [("pkg.sub", 0.1), ("json", 0.0)]
+    assert summary["packages"] == [("pkg", 0.5), ("_io", 0.1)]
+    assert summary["modules"][0] == ("pkg", 0.4)
+
+
+def test_main_reports_module(capsys):
+    assert main(["--module", "json", "--json"]) == 0
+    assert '"module": "json"' in capsys.readouterr().out
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    code = "import sys, app.main; print(sorted(m for m in ('markdown2', 'smtplib', 'email.mime.multipart') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
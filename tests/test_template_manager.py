@@ -0,0 +1,75 @@
+import os
+import markdown2
+import pytest
+from app.utils.template_manager import TemplateManager
+
+CONTEXT = {
+    "name": "Test User",
+    "verification_url": "http://example.com/verify/123/abc",
+    "email": "test@example.com",
+}
+
+
+def legacy_render(manager, template_name, **context):
+    """The original uncached pipeline: format, markdown, then style tag by tag."""
+    header = (manager.templates_dir / 'header.md').read_text(encoding='utf-8')
+    footer = (manager.templates_dir / 'footer.md').read_text(encoding='utf-8')
+    main_content = (manager.templates_dir / f'{template_name}.md').read_text(encoding='utf-8').format(**context)
+    html_content = markdown2.markdown(f"{header}\n{main_content}\n{footer}")
+    styles = {
+        'body': 'font-family: Arial, sans-serif; font-size: 16px; color: #333333; background-color: #ffffff; line-height: 1.5;',
+        'h1': 'font-size: 24px; color: #333333; font-weight: bold; margin-top: 20px; margin-bottom: 10px;',
+        'p': 'font-size: 16px; color: #666666; margin: 10px 0; line-height: 1.6;',
+        'a': 'color: #0056b3; text-decoration: none; font-weight: bold;',
+        'footer': 'font-size: 12px; color: #777777; padding: 20px 0;',
+        'ul': 'list-style-type: none; padding: 0;',
+        'li': 'margin-bottom: 10px;'
+    }
+    styled_html = f'<div style="{styles["body"]}">{html_content}</div>'
+    for tag, style in styles.items():
+        if tag != 'body':
+            styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
+    return styled_html
+
+
+@pytest.mark.parametrize("template_name", ["email_verification", "test_email"])
+def test_render_matches_uncached_pipeline(template_name):
+    manager = TemplateManager()
+    expected = legacy_render(manager, template_name, **CONTEXT)
+    assert manager.render_template(template_name, **CONTEXT) == expected
+    assert manager.render_template(template_name, **CONTEXT) == expected  # served from cache
+
+
+def test_render_compiles_once(mocker):
+    mocker.patch.dict(TemplateManager._compiled, clear=True)
+    markdown = mocker.spy(markdown2, "markdown")
+    for _ in range(3):
+        # A fresh manager per render, as the request-scoped dependency creates, still reuses the cache
+        TemplateManager().render_template("email_verification", **CONTEXT)
+    assert markdown.call_count == 1
+
+
+def test_render_escapes_context_values():
+    html = TemplateManager().render_template("email_verification", **{**CONTEXT, "name": "<script>x</script>"})
+    assert "<script>" not in html
+    assert "&lt;script&gt;x&lt;/script&gt;" in html
+
+
+def test_render_missing_context_raises():
+    with pytest.raises(KeyError):
+        TemplateManager().render_template("email_verification", name="Only Name")
+
+
+def test_template_change_invalidates_cache(tmp_path):
+    manager = TemplateManager()
+    for filename in ("header.md", "footer.md"):
+        (tmp_path / filename).write_text((manager.templates_dir / filename).read_text(encoding="utf-8"), encoding="utf-8")
+    manager.templates_dir = tmp_path
+    template = tmp_path / "greeting.md"
+    template.write_text("Hello {name}", encoding="utf-8")
+    assert "Hello Test User" in manager.render_template("greeting", **CONTEXT)
+
+    template.write_text("Goodbye {name}", encoding="utf-8")
+    stat = os.stat(template)
+    os.utime(template, (stat.st_atime, stat.st_mtime + 10))
+    assert "Goodbye Test User" in manager.render_template("greeting", **CONTEXT)